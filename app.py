@@ -2,26 +2,32 @@ from __future__ import annotations
 
 import datetime as dt
 import os
-import subprocess
+import re
 import sys
 import tkinter as tk
-import webbrowser
+import weakref
+from collections import ChainMap
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import timedelta
+from functools import lru_cache, partial
+from itertools import islice, zip_longest
 from pathlib import Path
+from types import MappingProxyType
 from tkinter import font as tkfont, messagebox, ttk
+from typing import Callable
 from uuid import uuid4
 
 import customtkinter as ctk
 from PIL import Image
-from tkcalendar import Calendar
 
 from paths import invoices_dir, resolve_qr_path
-from pdf_generator import build_invoice_pdf
 from storage import (
     delete_profile,
     load_history,
     load_profiles,
     load_settings,
+    profile_sort_key,
     prune_missing_history_files,
     record_invoice_history,
     remove_history_entry,
@@ -39,6 +45,16 @@ PAYMENT_TYPE_LABELS = {
     "paypal": "PayPal",
 }
 
+_INPUT_STYLE = MappingProxyType({"fg_color": "#000000", "text_color": "#f0f2f4", "border_color": "#323232", "border_width": 1})
+
+# kind -> (fg_color, hover_color)
+BUTTON_PALETTE = {
+    "primary": ("#1f6fb2", "#2a89d5"),
+    "add": ("#4ca663", "#5fc77a"),
+    "danger": ("#b33a3a", "#d34a4a"),
+    "muted": ("#3c4a57", "#516274"),
+}
+
 FIELD_DEFAULT_KEYS = {
     "service_category": "service_category",
     "service_title": "service_title",
@@ -57,7 +73,22 @@ FIELD_DEFAULT_KEYS = {
     "open_on_generate": "open_on_generate",
 }
 
-TOOLTIPS = {
+FIELD_FALLBACKS = {
+    "service_category": "Consulting",
+    "service_title": "Professional service",
+    "student_name": "",
+    "rate_per_hour": "75",
+    "session_duration_hours": "1.0",
+    "prep_hours": "0.0",
+    "prep_description": "Preparation and admin (not billed).",
+    "invoice_date_mode": "relative",
+    "terms_label": "Net 7",
+    "due_days": "7",
+    "currency": "GBP",
+    "open_on_generate": False,
+}
+
+TOOLTIPS = MappingProxyType({sys.intern(k): v for k, v in {
     "Provider": "Your business or personal profile shown as the invoice sender.",
     "Recipient": "The person or company receiving this invoice.",
     "Payment type": "Choose domestic bank transfer, international bank transfer, or PayPal.",
@@ -75,9 +106,9 @@ TOOLTIPS = {
     "Currency": "Currency code used in amounts and payment section.",
     "Extra work description": "Additional context or notes for non-billed prep/admin.",
     "Open invoice after generation": "If enabled, opens the PDF immediately after creation.",
-}
+}.items()})
 
-SUBWINDOW_TOOLTIPS = {
+SUBWINDOW_TOOLTIPS = MappingProxyType({sys.intern(k): v for k, v in {
     "Name": "Display name used in dropdowns and invoice output.",
     "Address (comma-separated)": "Use commas to split address lines.",
     "Email": "Contact email shown on invoices.",
@@ -92,33 +123,152 @@ SUBWINDOW_TOOLTIPS = {
     "PayPal email": "PayPal account email that should receive payment.",
     "PayPal link": "Optional PayPal.Me or checkout link.",
     "Currency": "Currency code for this payment profile.",
+}.items()})
+
+
+_SESSION_FMT = "%Y-%m-%d %H:%M"
+_DATE_FMT = "%Y-%m-%d"
+_FMT_SHAPES = {
+    _DATE_FMT: re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}"),
+    _SESSION_FMT: re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}"),
 }
+_DUE_DAYS_CACHE: dict[str, int] = {}
+_OFFSET_MIN, _OFFSET_MAX = -7, 7
+PROVIDER_FIELDS = (("display_name", "Name"), ("address", "Address (comma-separated)"), ("email", "Email"))
+RECIPIENT_FIELDS = PROVIDER_FIELDS + (("student_name", "Client reference"),)
+PAYMENT_FIELDS = MappingProxyType(
+    {
+        "paypal": (("label", "Profile label"), ("paypal_email", "PayPal email"), ("paypal_link", "PayPal link"), ("currency", "Currency")),
+        "bank_international": (
+            ("label", "Profile label"),
+            ("account_holder", "Account holder"),
+            ("bank_name", "Bank name"),
+            ("iban", "IBAN"),
+            ("bic", "BIC/SWIFT (optional)"),
+            ("currency", "Currency"),
+        ),
+        "bank_domestic": (
+            ("label", "Profile label"),
+            ("account_holder", "Account holder"),
+            ("bank_name", "Bank name"),
+            ("sort_code", "Sort code (optional)"),
+            ("account_number", "Account number (optional)"),
+            ("currency", "Currency"),
+        ),
+    }
+)
+
+_OFFSET_LABELS = {-1: "Yesterday", 0: "Today", 1: "Tomorrow"}
+_INVOICE_OFFSET_CELLS = tuple(
+    (offset, _OFFSET_LABELS.get(offset, f"{offset:+d}"), "danger" if offset < 0 else "add" if offset > 0 else "primary")
+    for offset in range(_OFFSET_MIN, _OFFSET_MAX + 1)
+)
 
+_SLUG_TABLE = {c: "-" for c in range(128) if not chr(c).isalnum()}
 
+
+@lru_cache(maxsize=256)
 def slugify(value: str) -> str:
-    return "".join(c.lower() if c.isalnum() else "-" for c in value).strip("-") or "recipient"
+    if value.isascii():
+        slug = value.lower().translate(_SLUG_TABLE)
+    else:
+        slug = "".join(c.lower() if c.isalnum() else "-" for c in value)
+    return slug.strip("-") or "recipient"
+
+
+def _render_job(invoice: dict, out_path: Path) -> Path:
+    from pdf_generator import build_invoice_pdf
+
+    return build_invoice_pdf(invoice, out_path)
+
+
+def _split_address(text: str) -> list[str]:
+    return [line for line in (part.strip() for part in text.split(",")) if line]
+
+
+def _var_text(var: tk.Variable, default: str = "") -> str:
+    return var.get().strip() or default
+
+
+def _parse_datetime(text: str, fmt: str) -> dt.datetime:
+    shape = _FMT_SHAPES.get(fmt)
+    if shape is not None and shape.fullmatch(text):
+        return dt.datetime.fromisoformat(text)
+    return dt.datetime.strptime(text, fmt)
+
+
+def _created_at(entry: dict) -> dt.datetime | None:
+    try:
+        return dt.datetime.fromisoformat((entry.get("created_at") or "").strip())
+    except ValueError:
+        return None
+
+
+def _recent_history_entries(items: list[dict]) -> list[dict]:
+    cutoff = dt.datetime.now() - timedelta(days=14)
+    candidates = (
+        entry
+        for entry in items
+        if (output_path := entry.get("output_path"))
+        and (created_at := _created_at(entry)) is not None
+        and created_at >= cutoff
+        and os.path.isfile(output_path)
+    )
+    return list(islice(candidates, 15))
+
+
+def _history_card_lines() -> list[tuple[str, str, str]]:
+    prune_missing_history_files()
+    return [
+        (
+            f"#{pos}  {entry.get('invoice_number', '')}",
+            f"{entry.get('recipient', 'Unknown')} • {entry.get('created_at', '')}",
+            entry.get("output_path", ""),
+        )
+        for pos, entry in enumerate(_recent_history_entries(load_history(limit=200)), start=1)
+    ]
 
 
 def open_file(path: Path) -> None:
     if sys.platform.startswith("win"):
         os.startfile(path)  # type: ignore[attr-defined]
-    elif sys.platform == "darwin":
-        subprocess.run(["open", str(path)], check=False)
     else:
-        subprocess.run(["xdg-open", str(path)], check=False)
+        import subprocess
 
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        subprocess.Popen([opener, str(path)], start_new_session=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-def float_steps(start: float, end: float, step: float) -> list[str]:
-    values: list[str] = []
-    current = start
-    while current <= end + 1e-9:
-        values.append(f"{current:.2f}".rstrip("0").rstrip("."))
-        current += step
-    return values
 
-def _try_close_boot_splash() -> bool:
+@lru_cache(maxsize=32)
+def float_steps(start: float, end: float, step: float) -> tuple[str, ...]:
+    count = int((end - start) / step + 1e-9) + 1
+    return tuple(f"{start + i * step:.2f}".rstrip("0").rstrip(".") for i in range(count))
+
+
+@lru_cache(maxsize=16)
+def _font(size: int, weight: str = "normal") -> ctk.CTkFont:
+    return ctk.CTkFont(size=size, weight=weight)
+
+
+@lru_cache(maxsize=4)
+def _decoded_image(path: Path, mtime_ns: int) -> Image.Image:
+    img = Image.open(path)
+    img.load()
+    return img
+
+
+CATEGORY_VALUES = ("Consulting", "Tutoring", "Design", "Development", "Coaching", "Maintenance", "Admin support")
+TERMS_VALUES = ("Due on receipt", "Net 7", "Net 14", "Net 30")
+CURRENCY_VALUES = ("GBP", "EUR", "USD")
+RATE_VALUES = tuple(str(v) for v in range(20, 151, 5))
+SESSION_HOURS_VALUES = float_steps(0.25, 12.0, 0.25)
+EXTRA_HOURS_VALUES = float_steps(0.0, 8.0, 0.25)
+DUE_DAYS_VALUES = ("7", "14", "30")
+
+@lru_cache(maxsize=1)
+def _splash_close_fns() -> tuple:
     if not getattr(sys, "frozen", False):
-        return False
+        return ()
 
     modules: list[object] = []
     try:
@@ -135,14 +285,16 @@ def _try_close_boot_splash() -> bool:
     except Exception:
         pass
 
-    for mod in modules:
-        close_fn = getattr(mod, "close", None)
-        if callable(close_fn):
-            try:
-                close_fn()
-                return True
-            except Exception:
-                continue
+    return tuple(fn for fn in (getattr(mod, "close", None) for mod in modules) if callable(fn))
+
+
+def _try_close_boot_splash() -> bool:
+    for close_fn in _splash_close_fns():
+        try:
+            close_fn()
+            return True
+        except Exception:
+            continue
     return False
 
 
@@ -152,46 +304,111 @@ def close_boot_splash() -> None:
 
 
 
-
 class Tooltip:
-    def __init__(self, widget: tk.Widget, text: str):
-        self.widget = widget
-        self.text = text
+    def __init__(self) -> None:
         self.tip_window: tk.Toplevel | None = None
-        widget.bind("<Enter>", self.show)
-        widget.bind("<Leave>", self.hide)
-
-    def show(self, _event=None):
-        if self.tip_window is not None:
+        self.tip_label: tk.Label | None = None
+        self._texts: weakref.WeakKeyDictionary[tk.Misc, tuple[weakref.ref, str]] = weakref.WeakKeyDictionary()
+        self._bound = False
+        self._visible = False
+
+    def attach(self, widget: tk.Widget, text: str) -> None:
+        if not self._bound:
+            widget.bind_all("<Enter>", self._on_enter, add="+")
+            widget.bind_all("<Leave>", self.hide, add="+")
+            self._bound = True
+        entry = (weakref.ref(widget), text)
+        pending = [widget]
+        while pending:
+            part = pending.pop()
+            self._texts[part] = entry
+            pending.extend(part.children.values())
+
+    def _on_enter(self, event) -> None:
+        if not isinstance(event.widget, tk.Misc):
             return
-        x = self.widget.winfo_rootx() + 18
-        y = self.widget.winfo_rooty() + self.widget.winfo_height() + 8
-        self.tip_window = tw = tk.Toplevel(self.widget)
-        tw.wm_overrideredirect(True)
-        tw.attributes("-topmost", True)
+        entry = self._texts.get(event.widget)
+        if entry is None:
+            return
+        owner = entry[0]()
+        if owner is not None:
+            self.show(owner, entry[1])
+
+    def _ensure_window(self, widget: tk.Widget) -> tuple[tk.Toplevel, tk.Label]:
+        if self.tip_window is None or not self.tip_window.winfo_exists():
+            self.tip_window = tw = tk.Toplevel(widget._root())
+            tw.withdraw()
+            tw.wm_overrideredirect(True)
+            tw.attributes("-topmost", True)
+            self.tip_label = tk.Label(
+                tw,
+                justify="left",
+                background="#111111",
+                foreground="#e9eef4",
+                relief="solid",
+                borderwidth=1,
+                font=("Verdana", 10),
+                padx=8,
+                pady=6,
+                wraplength=380,
+            )
+            self.tip_label.pack()
+        return self.tip_window, self.tip_label
+
+    def show(self, widget: tk.Widget, text: str, _event=None):
+        tw, lbl = self._ensure_window(widget)
+        x = widget.winfo_rootx() + 18
+        y = widget.winfo_rooty() + widget.winfo_height() + 8
+        lbl.configure(text=text)
         tw.wm_geometry(f"+{x}+{y}")
-        lbl = tk.Label(
-            tw,
-            text=self.text,
-            justify="left",
-            background="#111111",
-            foreground="#e9eef4",
-            relief="solid",
-            borderwidth=1,
-            font=("Verdana", 10),
-            padx=8,
-            pady=6,
-            wraplength=380,
-        )
-        lbl.pack()
+        tw.deiconify()
+        tw.lift()
+        self._visible = True
 
     def hide(self, _event=None):
-        if self.tip_window:
-            self.tip_window.destroy()
-            self.tip_window = None
+        if not self._visible:
+            return
+        self._visible = False
+        if self.tip_window is not None and self.tip_window.winfo_exists():
+            self.tip_window.withdraw()
+
+
+@dataclass(slots=True)
+class InvoiceFormState:
+    service_category_var: tk.StringVar
+    service_title_var: tk.StringVar
+    student_name_var: tk.StringVar
+    rate_var: tk.StringVar
+    duration_var: tk.StringVar
+    prep_hours_var: tk.StringVar
+    prep_description_var: tk.StringVar
+    invoice_date_mode_var: tk.StringVar
+    terms_var: tk.StringVar
+    due_days_var: tk.StringVar
+    currency_var: tk.StringVar
+    open_on_generate_var: tk.BooleanVar
+    session_start_var: tk.StringVar
+    invoice_date_relative_offset_var: tk.IntVar
+    invoice_date_absolute_var: tk.StringVar
+    invoice_date_var: tk.StringVar
 
 
 class InvoiceApp(ctk.CTk):
+    _VAR_SPEC = (
+        ("service_category_var", "service_category", False),
+        ("service_title_var", "service_title", False),
+        ("student_name_var", "student_name", False),
+        ("rate_var", "rate_per_hour", False),
+        ("duration_var", "session_duration_hours", False),
+        ("prep_hours_var", "prep_hours", False),
+        ("prep_description_var", "prep_description", False),
+        ("invoice_date_mode_var", "invoice_date_mode", False),
+        ("terms_var", "terms_label", False),
+        ("due_days_var", "due_days", False),
+        ("currency_var", "currency", False),
+        ("open_on_generate_var", "open_on_generate", True),
+    )
+
     def __init__(self) -> None:
         super().__init__()
         ctk.set_appearance_mode("System")
@@ -202,6 +419,13 @@ class InvoiceApp(ctk.CTk):
         self.minsize(980, 740)
 
         self.settings = load_settings()
+        self._settings_dirty = False
+        self._settings_after_id: str | None = None
+        self._history_refresh_after_id: str | None = None
+        self._payment_reload_after_id: str | None = None
+        self._last_payment_method: str | None = None
+        self._status_after_id: str | None = None
+        self._confirm_action: Callable[[], None] | None = None
         self.profiles = self._normalize_loaded_profiles(load_profiles())
 
         self.provider_var = tk.StringVar()
@@ -210,43 +434,116 @@ class InvoiceApp(ctk.CTk):
         self.payment_var = tk.StringVar()
 
         defaults = self.settings.get("field_defaults", {})
-        self.service_category_var = tk.StringVar(value=defaults.get("service_category", "Consulting"))
-        self.service_title_var = tk.StringVar(value=defaults.get("service_title", "Professional service"))
-        self.student_name_var = tk.StringVar(value=defaults.get("student_name", ""))
-        self.rate_var = tk.StringVar(value=str(defaults.get("rate_per_hour", "75")))
-        self.duration_var = tk.StringVar(value=str(defaults.get("session_duration_hours", "1.0")))
-        self.prep_hours_var = tk.StringVar(value=str(defaults.get("prep_hours", "0.0")))
-        self.prep_description_var = tk.StringVar(value=defaults.get("prep_description", "Preparation and admin (not billed)."))
-        self.session_start_var = tk.StringVar(value=defaults.get("session_start", dt.datetime.now().strftime("%Y-%m-%d %H:%M")))
-        self.invoice_date_mode_var = tk.StringVar(value=defaults.get("invoice_date_mode", "relative"))
-        self.invoice_date_relative_offset_var = tk.IntVar(value=self._coerce_invoice_offset(defaults))
-        self.invoice_date_absolute_var = tk.StringVar(value=defaults.get("invoice_date", dt.date.today().strftime("%Y-%m-%d")))
-        self.invoice_date_var = tk.StringVar(value="")
-        self.terms_var = tk.StringVar(value=defaults.get("terms_label", "Net 7"))
-        self.due_days_var = tk.StringVar(value=str(defaults.get("due_days", "7")))
-        self.currency_var = tk.StringVar(value=defaults.get("currency", "GBP"))
-        self.open_on_generate_var = tk.BooleanVar(value=bool(defaults.get("open_on_generate", False)))
-
-        self.history_cards: list[ctk.CTkFrame] = []
+        field_values = ChainMap(defaults, FIELD_FALLBACKS)
+        form_vars: dict[str, tk.Variable] = {}
+        for attr_name, default_key, is_bool in self._VAR_SPEC:
+            value = field_values[default_key]
+            form_vars[attr_name] = tk.BooleanVar(value=bool(value)) if is_bool else tk.StringVar(value=str(value))
+        self.form = InvoiceFormState(
+            **form_vars,
+            session_start_var=tk.StringVar(value=defaults.get("session_start", dt.datetime.now().strftime(_SESSION_FMT))),
+            invoice_date_relative_offset_var=tk.IntVar(value=self._coerce_invoice_offset(defaults)),
+            invoice_date_absolute_var=tk.StringVar(value=defaults.get("invoice_date", dt.date.today().strftime(_DATE_FMT))),
+            invoice_date_var=tk.StringVar(value=""),
+        )
+        form = self.form
+        self._text_limits = (
+            (form.service_category_var, 48),
+            (form.service_title_var, 120),
+            (form.student_name_var, 48),
+            (form.terms_var, 20),
+            (form.currency_var, 8),
+        )
+
+        self._profile_index: dict[str, dict[str, dict]] = {}
+        self._profile_id_index: dict[str, dict[str, dict]] = {}
+        self._profile_labels: dict[str, tuple[str, ...]] = {}
+        self._payment_labels: dict[str, tuple[str, ...]] = {}
+
+        self._pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="invoice-pdf")
+        self._history_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="invoice-history")
+        self._record_dialogs: dict[tuple[tuple[str, str], ...], tuple[ctk.CTkToplevel, dict[str, tk.StringVar], tk.StringVar]] = {}
+        self._date_pickers: dict[str, tuple[ctk.CTkToplevel, tk.Widget, tk.StringVar, tk.StringVar]] = {}
+        self.history_cards: list[tuple[ctk.CTkFrame, ctk.CTkLabel, ctk.CTkLabel, tk.StringVar]] = []
+        self._history_card_texts: list[tuple[str, str, str] | None] = []
+        self._history_key: tuple[tuple[str, str, str], ...] | None = None
         self.donation_qr_image: ctk.CTkImage | None = None
         self.donation_qr_path: Path | None = resolve_qr_path()
-        self.tooltips: list[Tooltip] = []
+        self.tooltip = Tooltip()
 
         self._setup_accessible_fonts_and_inputs()
 
         self._build_ui()
         self._load_defaults()
         self._sync_invoice_date_display()
-        prune_missing_history_files()
-        self._refresh_history()
+        self.after(30, self._poll_bootstrap, self._history_executor.submit(self._bg_bootstrap))
         self.after(120, self._maximize_window)
         self.after(150, self._close_boot_splash_retries)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _bg_bootstrap(self) -> tuple[list[tuple[str, str, str]] | None, Image.Image | None]:
+        lines: list[tuple[str, str, str]] | None = None
+        qr_img: Image.Image | None = None
+        try:
+            lines = _history_card_lines()
+        except Exception:
+            lines = None
+        if self.donation_qr_path is not None:
+            try:
+                qr_img = _decoded_image(self.donation_qr_path, self.donation_qr_path.stat().st_mtime_ns)
+            except Exception:
+                qr_img = None
+        return lines, qr_img
 
-    def _close_boot_splash_retries(self) -> None:
-        if _try_close_boot_splash():
+    def _poll_bootstrap(self, future: Future) -> None:
+        if not future.done():
+            self.after(30, self._poll_bootstrap, future)
             return
-        self.after(350, _try_close_boot_splash)
-        self.after(800, _try_close_boot_splash)
+        lines, qr_img = future.result()
+        if qr_img is not None:
+            self._attach_donation_qr(qr_img)
+        if lines is None:
+            self._refresh_history()
+        else:
+            self._render_history(lines)
+
+    def _on_close(self) -> None:
+        if self._settings_after_id is not None:
+            self.after_cancel(self._settings_after_id)
+        if self._history_refresh_after_id is not None:
+            self.after_cancel(self._history_refresh_after_id)
+        if self._payment_reload_after_id is not None:
+            self.after_cancel(self._payment_reload_after_id)
+        if self._status_after_id is not None:
+            self.after_cancel(self._status_after_id)
+        try:
+            self._flush_settings_if_dirty()
+        finally:
+            self._pdf_executor.shutdown(wait=False)
+            self._history_executor.shutdown(wait=False)
+            self.destroy()
+
+    def _schedule_settings_save(self) -> None:
+        self._settings_dirty = True
+        if self._settings_after_id is not None:
+            self.after_cancel(self._settings_after_id)
+        self._settings_after_id = self.after(500, self._flush_settings_if_dirty)
+
+    def _flush_settings_if_dirty(self) -> None:
+        self._settings_after_id = None
+        if not self._settings_dirty:
+            return
+        self._settings_dirty = False
+        try:
+            save_settings(self.settings)
+        except Exception as exc:
+            self._settings_dirty = True
+            messagebox.showerror("Error", str(exc))
+
+    def _close_boot_splash_retries(self, tries_left: int = 3) -> None:
+        if not _splash_close_fns() or _try_close_boot_splash() or tries_left <= 1:
+            return
+        self.after(400, self._close_boot_splash_retries, tries_left - 1)
 
     def _normalize_loaded_profiles(self, profiles: dict) -> dict:
         for p in profiles.get("payment_method", []):
@@ -288,14 +585,8 @@ class InvoiceApp(ctk.CTk):
         )
 
     def _style_button(self, parent, text: str, *, kind: str = "primary", width: int = 90, command=None):
-        palette = {
-            "primary": {"fg": "#1f6fb2", "hover": "#2a89d5"},
-            "add": {"fg": "#4ca663", "hover": "#5fc77a"},
-            "danger": {"fg": "#b33a3a", "hover": "#d34a4a"},
-            "muted": {"fg": "#3c4a57", "hover": "#516274"},
-        }
-        c = palette[kind]
-        return ctk.CTkButton(parent, text=text, width=width, fg_color=c["fg"], hover_color=c["hover"], command=command)
+        fg, hover = BUTTON_PALETTE[kind]
+        return ctk.CTkButton(parent, text=text, width=width, fg_color=fg, hover_color=hover, command=command)
 
     def _maximize_window(self) -> None:
         try:
@@ -344,26 +635,32 @@ class InvoiceApp(ctk.CTk):
 
         row = self._profile_row(left, row, "Payment profile", self.payment_var, "payment_method")
 
-        category_values = ["Consulting", "Tutoring", "Design", "Development", "Coaching", "Maintenance", "Admin support"]
-        terms_values = ["Due on receipt", "Net 7", "Net 14", "Net 30"]
-        currency_values = ["GBP", "EUR", "USD"]
+        self.confirm_bar = ctk.CTkFrame(left, fg_color="transparent")
+        self.confirm_bar.grid(row=row, column=0, columnspan=3, padx=10, pady=(0, 8), sticky="ew")
+        self.confirm_bar.grid_columnconfigure(0, weight=1)
+        self.confirm_label = ctk.CTkLabel(self.confirm_bar, text="", anchor="w")
+        self.confirm_label.grid(row=0, column=0, sticky="ew")
+        self._style_button(self.confirm_bar, "Delete", kind="danger", width=90, command=partial(self._resolve_confirm, True)).grid(row=0, column=1, padx=(8, 4))
+        self._style_button(self.confirm_bar, "Cancel", kind="muted", width=90, command=partial(self._resolve_confirm, False)).grid(row=0, column=2)
+        self.confirm_bar.grid_remove()
+        row += 1
 
-        row = self._field_row(left, row, "Service category", self.service_category_var, "service_category", values=category_values)
-        row = self._field_row(left, row, "Service title", self.service_title_var, "service_title")
-        row = self._field_row(left, row, "Client reference (optional)", self.student_name_var, "client_reference")
-        row = self._field_row(left, row, "Rate per hour", self.rate_var, "rate_per_hour", values=[str(v) for v in range(20, 151, 5)])
-        row = self._field_row(left, row, "Session/work hours", self.duration_var, "session_hours", values=float_steps(0.25, 12.0, 0.25))
-        row = self._field_row(left, row, "Extra hours (not billed)", self.prep_hours_var, "extra_hours", values=float_steps(0.0, 8.0, 0.25))
-        row = self._field_row(left, row, "Session start (YYYY-MM-DD HH:MM)", self.session_start_var, "session_start", date_mode="session_start")
-        row = self._field_row(left, row, "Invoice date", self.invoice_date_var, "invoice_date", date_mode="invoice_date", readonly=True)
+        row = self._field_row(left, row, "Service category", self.form.service_category_var, "service_category", values=CATEGORY_VALUES)
+        row = self._field_row(left, row, "Service title", self.form.service_title_var, "service_title")
+        row = self._field_row(left, row, "Client reference (optional)", self.form.student_name_var, "client_reference")
+        row = self._field_row(left, row, "Rate per hour", self.form.rate_var, "rate_per_hour", values=RATE_VALUES)
+        row = self._field_row(left, row, "Session/work hours", self.form.duration_var, "session_hours", values=SESSION_HOURS_VALUES)
+        row = self._field_row(left, row, "Extra hours (not billed)", self.form.prep_hours_var, "extra_hours", values=EXTRA_HOURS_VALUES)
+        row = self._field_row(left, row, "Session start (YYYY-MM-DD HH:MM)", self.form.session_start_var, "session_start", date_mode="session_start")
+        row = self._field_row(left, row, "Invoice date", self.form.invoice_date_var, "invoice_date", date_mode="invoice_date", readonly=True)
 
         lbl_mode = ctk.CTkLabel(left, text="Invoice date mode")
         lbl_mode.grid(row=row, column=0, sticky="w", padx=10, pady=8)
         self._attach_tooltip(lbl_mode, "Relative tracks today with an offset, absolute keeps a fixed date.")
         mode_frame = ctk.CTkFrame(left, fg_color="transparent")
         mode_frame.grid(row=row, column=1, sticky="w", padx=10, pady=6)
-        rb_rel = ctk.CTkRadioButton(mode_frame, text="Relative", variable=self.invoice_date_mode_var, value="relative", command=self._sync_invoice_date_display)
-        rb_abs = ctk.CTkRadioButton(mode_frame, text="Absolute", variable=self.invoice_date_mode_var, value="absolute", command=self._sync_invoice_date_display)
+        rb_rel = ctk.CTkRadioButton(mode_frame, text="Relative", variable=self.form.invoice_date_mode_var, value="relative", command=self._sync_invoice_date_display)
+        rb_abs = ctk.CTkRadioButton(mode_frame, text="Absolute", variable=self.form.invoice_date_mode_var, value="absolute", command=self._sync_invoice_date_display)
         rb_rel.pack(side=tk.LEFT, padx=(0, 10))
         rb_abs.pack(side=tk.LEFT, padx=(0, 10))
         self._attach_tooltip(rb_rel, "Relative uses today plus a saved offset from -7 to +7.")
@@ -371,50 +668,53 @@ class InvoiceApp(ctk.CTk):
         self._style_button(left, "Set default", kind="muted", width=90, command=self._set_invoice_date_defaults).grid(row=row, column=2, padx=10, pady=8)
         row += 1
 
-        row = self._field_row(left, row, "Terms label", self.terms_var, "terms", values=terms_values)
-        row = self._field_row(left, row, "Due days", self.due_days_var, "due_days", values=["7", "14", "30"])
-        row = self._field_row(left, row, "Currency", self.currency_var, "currency", values=currency_values)
+        row = self._field_row(left, row, "Terms label", self.form.terms_var, "terms", values=TERMS_VALUES)
+        row = self._field_row(left, row, "Due days", self.form.due_days_var, "due_days", values=DUE_DAYS_VALUES)
+        row = self._field_row(left, row, "Currency", self.form.currency_var, "currency", values=CURRENCY_VALUES)
 
         lbl_extra = ctk.CTkLabel(left, text="Extra work description")
         lbl_extra.grid(row=row, column=0, sticky="nw", padx=10, pady=8)
         self._attach_tooltip(lbl_extra, TOOLTIPS["Extra work description"])
-        self.prep_text = ctk.CTkTextbox(left, height=120, fg_color="#000000", text_color="#f0f2f4", border_color="#323232", border_width=1)
+        self.prep_text = ctk.CTkTextbox(left, height=120, **_INPUT_STYLE)
         self.prep_text.grid(row=row, column=1, sticky="ew", padx=10, pady=8)
-        self.prep_text.insert("1.0", self.prep_description_var.get())
+        self.prep_text.insert("1.0", self.form.prep_description_var.get())
+        self._sync_prep_text()
+        self.prep_text.bind("<<Modified>>", self._sync_prep_text)
         self._attach_tooltip(self.prep_text, TOOLTIPS["Extra work description"])
-        self._style_button(left, "Set default", kind="muted", width=90, command=lambda: self._set_default("extra_description", self.prep_text.get("1.0", "end").strip())).grid(row=row, column=2, padx=10, pady=8)
+        self._style_button(left, "Set default", kind="muted", width=90, command=self._set_prep_description_default).grid(row=row, column=2, padx=10, pady=8)
 
         row += 1
-        chk_open = ctk.CTkCheckBox(left, text="Open invoice after generation", variable=self.open_on_generate_var)
+        chk_open = ctk.CTkCheckBox(left, text="Open invoice after generation", variable=self.form.open_on_generate_var)
         chk_open.grid(row=row, column=1, sticky="w", padx=10, pady=6)
         self._attach_tooltip(chk_open, TOOLTIPS["Open invoice after generation"])
-        self._style_button(left, "Set default", kind="muted", width=90, command=lambda: self._set_default("open_on_generate", self.open_on_generate_var.get())).grid(row=row, column=2, padx=10, pady=6)
+        self._style_button(left, "Set default", kind="muted", width=90, command=partial(self._set_default_from_var, "open_on_generate", self.form.open_on_generate_var)).grid(row=row, column=2, padx=10, pady=6)
 
         row += 1
-        self._style_button(left, "Generate Invoice PDF", kind="primary", width=220, command=self._generate_invoice).grid(row=row, column=0, columnspan=3, pady=20, padx=10, sticky="ew")
+        self.generate_button = self._style_button(left, "Generate Invoice PDF", kind="primary", width=220, command=self._generate_invoice)
+        self.generate_button.grid(row=row, column=0, columnspan=3, pady=(20, 4), padx=10, sticky="ew")
+
+        row += 1
+        self.status_label = ctk.CTkLabel(left, text="", text_color="#4ca663")
+        self.status_label.grid(row=row, column=0, columnspan=3, padx=10, pady=(0, 12), sticky="ew")
 
         header_row = ctk.CTkFrame(right, fg_color="transparent")
         header_row.grid(row=0, column=0, sticky="ew", padx=10, pady=(12, 4))
         header_row.grid_columnconfigure(0, weight=1)
-        ctk.CTkLabel(header_row, text="Recent invoices", font=ctk.CTkFont(size=18, weight="bold")).grid(row=0, column=0, sticky="w")
+        ctk.CTkLabel(header_row, text="Recent invoices", font=_font(18, "bold")).grid(row=0, column=0, sticky="w")
         self._style_button(header_row, "Refresh", kind="primary", width=88, command=self._refresh_history).grid(row=0, column=1, sticky="e")
 
         self.history_frame = ctk.CTkScrollableFrame(right, corner_radius=10)
         self.history_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=8)
 
-        donate_frame = ctk.CTkFrame(right)
+        donate_frame = self.donate_frame = ctk.CTkFrame(right)
         donate_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=(2, 10))
         donate_frame.grid_columnconfigure(1, weight=1)
 
-        ctk.CTkLabel(donate_frame, text="If this app is useful, buy me a coffee (£5) ☕", font=ctk.CTkFont(size=14, weight="bold")).grid(row=0, column=1, sticky="w", padx=10, pady=(10, 0))
+        ctk.CTkLabel(donate_frame, text="If this app is useful, buy me a coffee (£5) ☕", font=_font(14, "bold")).grid(row=0, column=1, sticky="w", padx=10, pady=(10, 0))
         ctk.CTkLabel(donate_frame, text="Scan the QR code to support development.", text_color=("gray35", "gray70")).grid(row=1, column=1, sticky="w", padx=10, pady=(0, 8))
 
         if self.donation_qr_path is not None:
-            self.donation_qr_image = ctk.CTkImage(light_image=Image.open(self.donation_qr_path), dark_image=Image.open(self.donation_qr_path), size=(192, 192))
-            label = ctk.CTkLabel(donate_frame, text="", image=self.donation_qr_image)
-            label.grid(row=0, column=0, rowspan=4, padx=10, pady=10, sticky="nsw")
-            label.bind("<Button-1>", lambda _e, p=self.donation_qr_path: open_file(p))
-            self._style_button(donate_frame, "Open QR image", kind="primary", width=120, command=lambda p=self.donation_qr_path: open_file(p)).grid(row=2, column=1, sticky="w", padx=10, pady=(0, 6))
+            self._style_button(donate_frame, "Open QR image", kind="primary", width=120, command=partial(open_file, self.donation_qr_path)).grid(row=2, column=1, sticky="w", padx=10, pady=(0, 6))
         else:
             ctk.CTkLabel(donate_frame, text="QR.png not found (checked user data, exe folder, and bundled assets).", text_color=("gray45", "gray70")).grid(row=2, column=1, sticky="w", padx=10, pady=(0, 6))
 
@@ -422,12 +722,28 @@ class InvoiceApp(ctk.CTk):
 
         self._style_button(right, "Open invoices folder", kind="primary", width=150, command=self._open_invoices_folder).grid(row=3, column=0, sticky="w", padx=10, pady=(0, 10))
 
+    def _attach_donation_qr(self, qr_img: Image.Image) -> None:
+        self.donation_qr_image = ctk.CTkImage(light_image=qr_img, dark_image=qr_img, size=(192, 192))
+        label = ctk.CTkLabel(self.donate_frame, text="", image=self.donation_qr_image)
+        label.grid(row=0, column=0, rowspan=4, padx=10, pady=10, sticky="nsw")
+        label.bind("<Button-1>", lambda _e, p=self.donation_qr_path: open_file(p))
+
     def _profile_row(self, parent, row: int, label: str, var: tk.StringVar, profile_type: str) -> int:
+        label = sys.intern(label)
         lbl = ctk.CTkLabel(parent, text=label)
         lbl.grid(row=row, column=0, sticky="w", padx=10, pady=8)
         self._attach_tooltip(lbl, TOOLTIPS[label])
 
-        combo = ttk.Combobox(parent, textvariable=var, state="readonly")
+        combo = ctk.CTkOptionMenu(
+            parent,
+            variable=var,
+            values=(),
+            dynamic_resizing=False,
+            fg_color="#000000",
+            button_color="#323232",
+            button_hover_color="#474747",
+            text_color="#f0f2f4",
+        )
         combo.grid(row=row, column=1, sticky="ew", padx=10, pady=8)
         self._attach_tooltip(combo, TOOLTIPS[label])
 
@@ -446,10 +762,10 @@ class InvoiceApp(ctk.CTk):
         action.grid(row=row, column=2, padx=8, pady=6, sticky="e")
         action.grid_columnconfigure((0, 1), weight=1)
 
-        add_btn = self._style_button(action, "Add", kind="add", width=100, command=lambda t=profile_type: self._add_profile_dialog(t))
-        edit_btn = self._style_button(action, "Edit", kind="primary", width=100, command=lambda t=profile_type: self._edit_profile_dialog(t))
-        del_btn = self._style_button(action, "Delete", kind="danger", width=100, command=lambda t=profile_type: self._delete_profile(t))
-        def_btn = self._style_button(action, "Set default", kind="muted", width=100, command=lambda t=profile_type: self._set_default_profile(t))
+        add_btn = self._style_button(action, "Add", kind="add", width=100, command=partial(self._add_profile_dialog, profile_type))
+        edit_btn = self._style_button(action, "Edit", kind="primary", width=100, command=partial(self._edit_profile_dialog, profile_type))
+        del_btn = self._style_button(action, "Delete", kind="danger", width=100, command=partial(self._delete_profile, profile_type))
+        def_btn = self._style_button(action, "Set default", kind="muted", width=100, command=partial(self._set_default_profile, profile_type))
 
         add_btn.grid(row=0, column=0, padx=2, pady=2, sticky="ew")
         edit_btn.grid(row=0, column=1, padx=2, pady=2, sticky="ew")
@@ -468,10 +784,11 @@ class InvoiceApp(ctk.CTk):
         label: str,
         var: tk.StringVar,
         key: str,
-        values: list[str] | None = None,
+        values: tuple[str, ...] | None = None,
         date_mode: str | None = None,
         readonly: bool = False,
     ) -> int:
+        label = sys.intern(label)
         lbl = ctk.CTkLabel(parent, text=label)
         lbl.grid(row=row, column=0, sticky="w", padx=10, pady=8)
         self._attach_tooltip(lbl, TOOLTIPS[label])
@@ -480,115 +797,173 @@ class InvoiceApp(ctk.CTk):
             widget = ttk.Combobox(parent, textvariable=var, values=values, state="normal", width=34)
             widget.grid(row=row, column=1, sticky="ew", padx=10, pady=8)
         else:
-            widget = ctk.CTkEntry(parent, textvariable=var, height=34, fg_color="#000000", text_color="#f0f2f4", border_color="#323232", border_width=1)
+            widget = ctk.CTkEntry(parent, textvariable=var, height=34, **_INPUT_STYLE)
             if readonly:
                 widget.configure(state="readonly")
             widget.grid(row=row, column=1, sticky="ew", padx=10, pady=8)
         self._attach_tooltip(widget, TOOLTIPS[label])
 
         if date_mode:
+            set_default = self._set_invoice_date_defaults if date_mode == "invoice_date" else partial(self._set_default_from_var, key, var)
             btn_frame = ctk.CTkFrame(parent, fg_color="transparent")
             btn_frame.grid(row=row, column=2, padx=10, pady=8, sticky="e")
-            self._style_button(btn_frame, "Pick", kind="primary", width=58, command=lambda m=date_mode: self._open_date_picker(m)).pack(side=tk.LEFT, padx=(0, 6))
-            if date_mode == "invoice_date":
-                self._style_button(btn_frame, "Set default", kind="muted", width=90, command=self._set_invoice_date_defaults).pack(side=tk.LEFT)
-            else:
-                self._style_button(btn_frame, "Set default", kind="muted", width=90, command=lambda k=key, v=var: self._set_default(k, v.get())).pack(side=tk.LEFT)
+            self._style_button(btn_frame, "Pick", kind="primary", width=58, command=partial(self._open_date_picker, date_mode)).pack(side=tk.LEFT, padx=(0, 6))
+            self._style_button(btn_frame, "Set default", kind="muted", width=90, command=set_default).pack(side=tk.LEFT)
         else:
-            self._style_button(parent, "Set default", kind="muted", width=90, command=lambda k=key, v=var: self._set_default(k, v.get())).grid(row=row, column=2, padx=10, pady=8)
+            self._style_button(parent, "Set default", kind="muted", width=90, command=partial(self._set_default_from_var, key, var)).grid(row=row, column=2, padx=10, pady=8)
         return row + 1
 
     def _attach_tooltip(self, widget, text: str) -> None:
-        self.tooltips.append(Tooltip(widget, text))
+        self.tooltip.attach(widget, text)
 
     def _reload_combos(self) -> None:
-        self.provider_combo["values"] = [p["display_name"] for p in self.profiles.get("provider", [])]
-        self.recipient_combo["values"] = [r["display_name"] for r in self.profiles.get("recipient", [])]
+        self._set_combo_values(self.provider_combo, self._profile_labels.get("provider", ()))
+        self._set_combo_values(self.recipient_combo, self._profile_labels.get("recipient", ()))
         self._reload_payment_combo()
 
+    def _set_combo_values(self, combo: ctk.CTkOptionMenu, values: tuple[str, ...]) -> None:
+        if combo.cget("values") != values:
+            combo.configure(values=values)
+
+    def _rebuild_profile_index(self, profile_type: str | None = None) -> None:
+        if profile_type is None:
+            self._profile_index = {}
+            self._profile_id_index = {}
+            self._profile_labels = {}
+            self._payment_labels = {}
+            types = self.profiles.items()
+        else:
+            types = ((profile_type, self.profiles.get(profile_type, [])),)
+        for type_name, items in types:
+            by_display: dict[str, dict] = {}
+            by_id: dict[str, dict] = {}
+            for item in items:
+                by_display.setdefault(item.get("display_name") or item.get("label"), item)
+                by_id.setdefault(item.get("id"), item)
+            self._profile_index[type_name] = by_display
+            self._profile_id_index[type_name] = by_id
+            if type_name == "payment_method":
+                by_method: dict[str, list[str]] = {}
+                for item in items:
+                    by_method.setdefault(item.get("method_type"), []).append(item.get("label", item["id"]))
+                self._payment_labels = {method: tuple(labels) for method, labels in by_method.items()}
+            else:
+                self._profile_labels[type_name] = tuple(item["display_name"] for item in items)
+
     def _load_defaults(self) -> None:
+        self._rebuild_profile_index()
         self._reload_combos()
         selected = self.settings.get("selected_profiles", {})
         self._select_combo_by_id("provider", selected.get("provider_id"), self.provider_var)
         self._select_combo_by_id("recipient", selected.get("recipient_id"), self.recipient_var)
 
         default_payment_type = selected.get("payment_type")
-        if default_payment_type in set(PAYMENT_TYPE_LABELS):
+        if default_payment_type in PAYMENT_TYPE_LABELS:
             self.payment_type_var.set(default_payment_type)
         else:
             self.payment_type_var.set("bank_domestic")
         self._reload_payment_combo()
         self._select_combo_by_id("payment_method", selected.get("payment_method_id"), self.payment_var)
-        if not self.payment_var.get() and self.payment_combo["values"]:
-            self.payment_var.set(self.payment_combo["values"][0])
+        if not self.payment_var.get() and self.payment_combo.cget("values"):
+            self.payment_var.set(self.payment_combo.cget("values")[0])
+
+    def _refresh_profile_widget(self, profile_type: str) -> None:
+        self._rebuild_profile_index(profile_type)
+        if profile_type == "payment_method":
+            self._reload_payment_combo()
+            return
+        combo, var = (self.provider_combo, self.provider_var) if profile_type == "provider" else (self.recipient_combo, self.recipient_var)
+        values = self._profile_labels.get(profile_type, ())
+        self._set_combo_values(combo, values)
+        if var.get() not in values:
+            selected = self.settings.get("selected_profiles", {})
+            self._select_combo_by_id(profile_type, selected.get(f"{profile_type}_id"), var)
 
     def _select_combo_by_id(self, profile_type: str, profile_id: str | None, target_var: tk.StringVar) -> None:
         items = self.profiles.get(profile_type, [])
         if not items:
             target_var.set("")
             return
-        match = next((i for i in items if i.get("id") == profile_id), items[0])
+        match = self._profile_id_index.get(profile_type, {}).get(profile_id, items[0])
         target_var.set(match.get("display_name") or match.get("label") or "")
 
     def _reload_payment_combo(self) -> None:
-        method = self.payment_type_var.get()
-        payments = [p for p in self.profiles.get("payment_method", []) if p.get("method_type") == method]
-        self.payment_combo["values"] = [p.get("label", p["id"]) for p in payments]
-        if self.payment_var.get() not in self.payment_combo["values"]:
-            self.payment_var.set(self.payment_combo["values"][0] if self.payment_combo["values"] else "")
+        self._last_payment_method = method = self.payment_type_var.get()
+        values = self._payment_labels.get(method, ())
+        self._set_combo_values(self.payment_combo, values)
+        if self.payment_var.get() not in values:
+            self.payment_var.set(values[0] if values else "")
 
     def _on_payment_type_changed(self) -> None:
-        self._reload_payment_combo()
+        if self._payment_reload_after_id is None:
+            self._payment_reload_after_id = self.after_idle(self._do_payment_reload)
+
+    def _do_payment_reload(self) -> None:
+        self._payment_reload_after_id = None
+        if self.payment_type_var.get() != self._last_payment_method:
+            self._reload_payment_combo()
 
     def _find_profile(self, type_name: str, display: str) -> dict:
-        for item in self.profiles.get(type_name, []):
-            key = item.get("display_name") or item.get("label")
-            if key == display:
-                return item
-        raise ValueError(f"{type_name} profile not found: {display}")
+        try:
+            return self._profile_index[type_name][display]
+        except KeyError:
+            raise ValueError(f"{type_name} profile not found: {display}") from None
 
     def _set_default_profile(self, profile_type: str) -> None:
         try:
             selected_profiles = self.settings.setdefault("selected_profiles", {})
             if profile_type == "provider":
-                selected_profiles["provider_id"] = self._find_profile("provider", self.provider_var.get())["id"]
+                updates = {"provider_id": self._find_profile("provider", self.provider_var.get())["id"]}
             elif profile_type == "recipient":
-                selected_profiles["recipient_id"] = self._find_profile("recipient", self.recipient_var.get())["id"]
+                updates = {"recipient_id": self._find_profile("recipient", self.recipient_var.get())["id"]}
             else:
-                selected_profiles["payment_method_id"] = self._find_profile("payment_method", self.payment_var.get())["id"]
-                selected_profiles["payment_type"] = self.payment_type_var.get()
-            save_settings(self.settings)
-            messagebox.showinfo("Saved", "Default profile saved.")
+                updates = {
+                    "payment_method_id": self._find_profile("payment_method", self.payment_var.get())["id"],
+                    "payment_type": self.payment_type_var.get(),
+                }
+            if all(selected_profiles.get(k) == v for k, v in updates.items()):
+                self._flash_status("Already the default.")
+                return
+            selected_profiles.update(updates)
+            self._schedule_settings_save()
+            self._flash_status("Default profile saved.")
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
 
+    def _sync_prep_text(self, _event=None) -> None:
+        # Clearing the flag re-arms <<Modified>>, which Tk only fires when the flag flips.
+        if not self.prep_text.edit_modified():
+            return
+        self.form.prep_description_var.set(self.prep_text.get("1.0", "end").strip())
+        self.prep_text.edit_modified(False)
+
     def _sanitize_invoice_texts(self) -> None:
-        limits = [
-            (self.service_category_var, 48),
-            (self.service_title_var, 120),
-            (self.student_name_var, 48),
-            (self.terms_var, 20),
-            (self.currency_var, 8),
-        ]
-        for var, limit in limits:
+        self._sync_prep_text()
+        form = self.form
+        for var, limit in self._text_limits:
             value = var.get().strip()
             if len(value) > limit:
                 var.set(value[:limit])
 
-        prep = self.prep_text.get("1.0", "end").strip()
+        prep = form.prep_description_var.get()
         if len(prep) > 400:
             self.prep_text.delete("1.0", "end")
             self.prep_text.insert("1.0", prep[:400])
+            form.prep_description_var.set(prep[:400])
 
     def _clamped_invoice_offset(self, value: object) -> int:
         try:
             offset = int(value)
         except Exception:
             offset = 0
-        return max(-7, min(7, offset))
+        if _OFFSET_MIN <= offset <= _OFFSET_MAX:
+            return offset
+        return _OFFSET_MIN if offset < _OFFSET_MIN else _OFFSET_MAX
 
     def _coerce_invoice_offset(self, defaults: dict) -> int:
         raw = defaults.get("invoice_date_relative_offset")
+        if type(raw) is int and _OFFSET_MIN <= raw <= _OFFSET_MAX:
+            return raw
         if raw is None:
             legacy = (defaults.get("invoice_date_relative") or "today").strip().lower()
             if legacy == "yesterday":
@@ -611,33 +986,61 @@ class InvoiceApp(ctk.CTk):
         return f"today + {offset}"
 
     def _open_date_picker(self, mode: str) -> None:
-        dialog = ctk.CTkToplevel(self)
-        dialog.title("Pick date")
-        dialog.grab_set()
-        dialog.attributes("-topmost", True)
+        picker = self._date_pickers.get(mode)
+        if picker is None or not picker[0].winfo_exists():
+            picker = self._date_pickers[mode] = self._build_date_picker(mode)
+        dialog, cal, hour_var, min_var = picker
 
         if mode == "invoice_date":
-            if self.invoice_date_mode_var.get() == "absolute":
-                current = self.invoice_date_absolute_var.get().strip()
+            if self.form.invoice_date_mode_var.get() == "absolute":
+                current = self.form.invoice_date_absolute_var.get().strip()
             else:
-                current = self._effective_invoice_date().strftime("%Y-%m-%d")
+                current = self._effective_invoice_date().strftime(_DATE_FMT)
         else:
-            current = self.session_start_var.get().strip()
+            current = self.form.session_start_var.get().strip()
 
         try:
             if mode == "invoice_date":
-                cur_dt = dt.datetime.strptime(current, "%Y-%m-%d")
+                cur_dt = _parse_datetime(current, _DATE_FMT)
             else:
-                cur_dt = dt.datetime.strptime(current, "%Y-%m-%d %H:%M")
+                cur_dt = _parse_datetime(current, _SESSION_FMT)
         except Exception:
             cur_dt = dt.datetime.now()
 
+        cal.selection_set(cur_dt.date())
+        cal.see(cur_dt.date())
+        hour_var.set(f"{cur_dt.hour:02d}")
+        min_var.set(f"{cur_dt.minute:02d}")
+
+        dialog.deiconify()
+        dialog.attributes("-topmost", True)
+        dialog.lift()
+        dialog.grab_set()
+
+    @staticmethod
+    def _set_time_now(hour_var: tk.StringVar, min_var: tk.StringVar) -> None:
+        now = dt.datetime.now()
+        hour_var.set(f"{now.hour:02d}")
+        min_var.set(f"{now.minute:02d}")
+
+    def _close_date_picker(self, dialog: ctk.CTkToplevel) -> None:
+        dialog.grab_release()
+        dialog.withdraw()
+
+    def _build_date_picker(self, mode: str) -> tuple[ctk.CTkToplevel, tk.Widget, tk.StringVar, tk.StringVar]:
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Pick date")
+        dialog.protocol("WM_DELETE_WINDOW", lambda: self._close_date_picker(dialog))
+
         cal_columns = 5 if mode == "invoice_date" else 4
-        cal = Calendar(dialog, selectmode="day", year=cur_dt.year, month=cur_dt.month, day=cur_dt.day, date_pattern="yyyy-mm-dd")
+        from tkcalendar import Calendar
+
+        today = dt.date.today()
+        cal = Calendar(dialog, selectmode="day", year=today.year, month=today.month, day=today.day, date_pattern="yyyy-mm-dd")
         cal.grid(row=0, column=0, columnspan=cal_columns, padx=10, pady=10)
 
-        hour_var = tk.StringVar(value=f"{cur_dt.hour:02d}")
-        min_var = tk.StringVar(value=f"{cur_dt.minute:02d}")
+        hour_var = tk.StringVar(dialog)
+        min_var = tk.StringVar(dialog)
         if mode == "session_start":
             time_row = ctk.CTkFrame(dialog, fg_color="transparent")
             time_row.grid(row=1, column=0, columnspan=4, padx=10, pady=(0, 8), sticky="w")
@@ -645,16 +1048,16 @@ class InvoiceApp(ctk.CTk):
             tk.Spinbox(time_row, from_=0, to=23, textvariable=hour_var, width=4, format="%02.0f").pack(side=tk.LEFT)
             ctk.CTkLabel(time_row, text=":").pack(side=tk.LEFT, padx=4)
             tk.Spinbox(time_row, from_=0, to=59, textvariable=min_var, width=4, format="%02.0f").pack(side=tk.LEFT)
-            self._style_button(time_row, "Now", kind="muted", width=72, command=lambda: (hour_var.set(dt.datetime.now().strftime("%H")), min_var.set(dt.datetime.now().strftime("%M")))).pack(side=tk.LEFT, padx=(8, 0))
+            self._style_button(time_row, "Now", kind="muted", width=72, command=partial(self._set_time_now, hour_var, min_var)).pack(side=tk.LEFT, padx=(8, 0))
 
         def apply_date(target_date: dt.date, *, relative_offset: int | None = None) -> None:
             if mode == "invoice_date":
                 if relative_offset is None:
-                    self.invoice_date_mode_var.set("absolute")
-                    self.invoice_date_absolute_var.set(target_date.strftime("%Y-%m-%d"))
+                    self.form.invoice_date_mode_var.set("absolute")
+                    self.form.invoice_date_absolute_var.set(target_date.strftime(_DATE_FMT))
                 else:
-                    self.invoice_date_mode_var.set("relative")
-                    self.invoice_date_relative_offset_var.set(self._clamped_invoice_offset(relative_offset))
+                    self.form.invoice_date_mode_var.set("relative")
+                    self.form.invoice_date_relative_offset_var.set(self._clamped_invoice_offset(relative_offset))
                 self._sync_invoice_date_display()
             else:
                 try:
@@ -664,46 +1067,23 @@ class InvoiceApp(ctk.CTk):
                     now = dt.datetime.now()
                     h, m = now.hour, now.minute
                 merged = dt.datetime.combine(target_date, dt.time(h, m))
-                self.session_start_var.set(merged.strftime("%Y-%m-%d %H:%M"))
-            dialog.destroy()
+                self.form.session_start_var.set(merged.strftime(_SESSION_FMT))
+            self._close_date_picker(dialog)
 
         def apply_selected() -> None:
-            d = dt.datetime.strptime(cal.get_date(), "%Y-%m-%d").date()
+            d = dt.date.fromisoformat(cal.get_date())
             apply_date(d)
 
-        today = dt.date.today()
         action_row = 2 if mode == "session_start" else 1
         if mode == "invoice_date":
-            logical_offsets = [
-                [-7, -6, -5, -4, -3],
-                [-2, -1, 0, 1, 2],
-                [3, 4, 5, 6, 7],
-            ]
-            for row_idx, row_offsets in enumerate(logical_offsets):
-                for col_idx, offset in enumerate(row_offsets):
-                    if offset == -1:
-                        label = "Yesterday"
-                    elif offset == 1:
-                        label = "Tomorrow"
-                    elif offset == 0:
-                        label = "Today"
-                    else:
-                        label = f"{offset:+d}"
-
-                    if offset < 0:
-                        kind = "danger"
-                    elif offset > 0:
-                        kind = "add"
-                    else:
-                        kind = "primary"
-
-                    self._style_button(
-                        dialog,
-                        label,
-                        kind=kind,
-                        width=82,
-                        command=lambda off=offset: apply_date(today + timedelta(days=off), relative_offset=off),
-                    ).grid(row=action_row + row_idx, column=col_idx, padx=4, pady=(0, 6))
+            def apply_offset(offset: int) -> None:
+                apply_date(dt.date.today() + timedelta(days=offset), relative_offset=offset)
+
+            for i, (offset, label, kind) in enumerate(_INVOICE_OFFSET_CELLS):
+                row_idx, col_idx = divmod(i, 5)
+                self._style_button(dialog, label, kind=kind, width=82, command=partial(apply_offset, offset)).grid(
+                    row=action_row + row_idx, column=col_idx, padx=4, pady=(0, 6)
+                )
 
             self._style_button(dialog, "Use selected date", kind="primary", width=140, command=apply_selected).grid(
                 row=action_row + 3, column=0, columnspan=5, padx=6, pady=(4, 8)
@@ -713,193 +1093,298 @@ class InvoiceApp(ctk.CTk):
                 row=action_row, column=0, columnspan=4, padx=6, pady=(0, 8)
             )
 
+        return dialog, cal, hour_var, min_var
+
     def _set_invoice_date_defaults(self) -> None:
         defaults = self.settings.setdefault("field_defaults", {})
-        defaults["invoice_date_mode"] = self.invoice_date_mode_var.get()
-        defaults["invoice_date_relative_offset"] = self._clamped_invoice_offset(self.invoice_date_relative_offset_var.get())
-        defaults["invoice_date"] = self.invoice_date_absolute_var.get().strip()
-        save_settings(self.settings)
-        messagebox.showinfo("Saved", "Default set for invoice date")
+        defaults["invoice_date_mode"] = self.form.invoice_date_mode_var.get()
+        defaults["invoice_date_relative_offset"] = self._clamped_invoice_offset(self.form.invoice_date_relative_offset_var.get())
+        defaults["invoice_date"] = self.form.invoice_date_absolute_var.get().strip()
+        self._schedule_settings_save()
+        self._flash_status("Default set for invoice date")
 
     def _effective_invoice_date(self) -> dt.date:
-        if self.invoice_date_mode_var.get() == "relative":
-            offset = self._clamped_invoice_offset(self.invoice_date_relative_offset_var.get())
+        if self.form.invoice_date_mode_var.get() == "relative":
+            offset = self._clamped_invoice_offset(self.form.invoice_date_relative_offset_var.get())
             return dt.date.today() + timedelta(days=offset)
-        return dt.datetime.strptime(self.invoice_date_absolute_var.get().strip(), "%Y-%m-%d").date()
+        return _parse_datetime(self.form.invoice_date_absolute_var.get().strip(), _DATE_FMT).date()
 
     def _sync_invoice_date_display(self) -> None:
-        if self.invoice_date_mode_var.get() == "relative":
-            offset = self._clamped_invoice_offset(self.invoice_date_relative_offset_var.get())
+        if self.form.invoice_date_mode_var.get() == "relative":
+            offset = self._clamped_invoice_offset(self.form.invoice_date_relative_offset_var.get())
             effective = dt.date.today() + timedelta(days=offset)
-            self.invoice_date_var.set(f"{self._relative_invoice_label(offset)} ({effective.strftime('%Y-%m-%d')})")
+            self.form.invoice_date_var.set(f"{self._relative_invoice_label(offset)} ({effective.strftime('%Y-%m-%d')})")
         else:
-            date_text = self.invoice_date_absolute_var.get().strip()
+            date_text = self.form.invoice_date_absolute_var.get().strip()
             if not date_text:
-                date_text = dt.date.today().strftime("%Y-%m-%d")
-                self.invoice_date_absolute_var.set(date_text)
-            self.invoice_date_var.set(date_text)
+                date_text = dt.date.today().strftime(_DATE_FMT)
+                self.form.invoice_date_absolute_var.set(date_text)
+            self.form.invoice_date_var.set(date_text)
+
+    def _flash_status(self, text: str) -> None:
+        self.status_label.configure(text=text)
+        if self._status_after_id is not None:
+            self.after_cancel(self._status_after_id)
+        self._status_after_id = self.after(2500, self._clear_status)
+
+    def _clear_status(self) -> None:
+        self._status_after_id = None
+        self.status_label.configure(text="")
 
     def _set_default(self, field_key: str, value: object) -> None:
         model_key = FIELD_DEFAULT_KEYS[field_key]
-        self.settings.setdefault("field_defaults", {})[model_key] = value
-        save_settings(self.settings)
-        messagebox.showinfo("Saved", f"Default set for {field_key.replace('_', ' ')}")
+        defaults = self.settings.setdefault("field_defaults", {})
+        if model_key in defaults and defaults[model_key] == value:
+            self._flash_status("Already the default.")
+            return
+        defaults[model_key] = value
+        self._schedule_settings_save()
+        self._flash_status(f"Default set for {field_key.replace('_', ' ')}")
+
+    def _set_default_from_var(self, field_key: str, var: tk.Variable) -> None:
+        self._set_default(field_key, var.get())
+
+    def _set_prep_description_default(self) -> None:
+        self._sync_prep_text()
+        self._set_default_from_var("extra_description", self.form.prep_description_var)
 
     def _generate_invoice(self) -> None:
         try:
-            self._sanitize_invoice_texts()
-            provider = self._find_profile("provider", self.provider_var.get())
-            recipient = self._find_profile("recipient", self.recipient_var.get())
-            payment = self._find_profile("payment_method", self.payment_var.get())
-
-            session_start = dt.datetime.strptime(self.session_start_var.get().strip(), "%Y-%m-%d %H:%M")
-            invoice_date = self._effective_invoice_date()
-            due_days = int(self.due_days_var.get().strip())
-
-            recipient_slug = slugify(recipient["display_name"])
-            year = str(invoice_date.year)
-            timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-            invoice_number = f"INV-{invoice_date.strftime('%Y%m%d')}-{timestamp[-4:]}"
-            out_path = INVOICES_DIR / recipient_slug / year / f"{invoice_number}.pdf"
-
-            invoice = {
-                "provider": provider,
-                "recipient": recipient,
-                "payment_method": payment,
-                "service_category": self.service_category_var.get().strip() or "General",
-                "service_title": self.service_title_var.get().strip() or "Professional service",
-                "student_name": self.student_name_var.get().strip() or recipient.get("student_name", ""),
-                "rate_per_hour": float(self.rate_var.get().strip()),
-                "session_duration_hours": float(self.duration_var.get().strip()),
-                "prep_hours": float(self.prep_hours_var.get().strip()),
-                "prep_description": self.prep_text.get("1.0", "end").strip(),
-                "session_start": session_start,
-                "invoice_date": invoice_date,
-                "terms_label": self.terms_var.get().strip() or "Net 7",
-                "due_days": due_days,
-                "currency": self.currency_var.get().strip() or "GBP",
-                "invoice_number": invoice_number,
-            }
-            build_invoice_pdf(invoice, out_path)
-
-            record_invoice_history(
-                {
-                    "invoice_number": invoice_number,
-                    "recipient": recipient["display_name"],
-                    "recipient_id": recipient["id"],
-                    "service_category": invoice["service_category"],
-                    "output_path": str(out_path),
-                    "created_at": dt.datetime.now().isoformat(timespec="seconds"),
-                    "payment_method": payment.get("method_type", "bank_domestic"),
-                }
-            )
-            self._refresh_history()
-            if self.open_on_generate_var.get():
-                open_file(out_path)
-            messagebox.showinfo("Success", f"Invoice saved:\n{out_path}")
+            invoice, out_path = self._build_invoice_job()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
+            return
+        future = self._pdf_executor.submit(_render_job, invoice, out_path)
+        self.generate_button.configure(state="disabled")
+        self.after(50, self._poll_render, future, invoice)
+
+    def _on_invoice_generated(self, out_path: Path) -> None:
+        if self.form.open_on_generate_var.get():
+            open_file(out_path)
+        messagebox.showinfo("Success", f"Invoice saved:\n{out_path}")
+
+    def _build_invoice_job(self) -> tuple[dict, Path]:
+        self._sanitize_invoice_texts()
+        form = self.form
+        provider = self._find_profile("provider", self.provider_var.get())
+        recipient = self._find_profile("recipient", self.recipient_var.get())
+        payment = self._find_profile("payment_method", self.payment_var.get())
+
+        session_start = _parse_datetime(_var_text(form.session_start_var), _SESSION_FMT)
+        invoice_date = self._effective_invoice_date()
+        raw_due_days = form.due_days_var.get()
+        due_days = _DUE_DAYS_CACHE.get(raw_due_days)
+        if due_days is None:
+            due_days = _DUE_DAYS_CACHE[raw_due_days] = int(raw_due_days.strip())
+
+        recipient_slug = slugify(recipient["display_name"])
+        year = f"{invoice_date.year:04d}"
+        now = dt.datetime.now()
+        invoice_number = f"INV-{invoice_date.year:04d}{invoice_date.month:02d}{invoice_date.day:02d}-{now.minute:02d}{now.second:02d}"
+        out_path = INVOICES_DIR / recipient_slug / year / f"{invoice_number}.pdf"
+
+        invoice = {
+            "provider": provider,
+            "recipient": recipient,
+            "payment_method": payment,
+            "service_category": _var_text(form.service_category_var, "General"),
+            "service_title": _var_text(form.service_title_var, "Professional service"),
+            "student_name": _var_text(form.student_name_var) or recipient.get("student_name", ""),
+            "rate_per_hour": float(_var_text(form.rate_var)),
+            "session_duration_hours": float(_var_text(form.duration_var)),
+            "prep_hours": float(_var_text(form.prep_hours_var)),
+            "prep_description": form.prep_description_var.get(),
+            "session_start": session_start,
+            "invoice_date": invoice_date,
+            "terms_label": _var_text(form.terms_var, "Net 7"),
+            "due_days": due_days,
+            "currency": _var_text(form.currency_var, "GBP"),
+            "invoice_number": invoice_number,
+        }
+        return invoice, out_path
+
+    def _poll_render(self, future: Future, invoice: dict) -> None:
+        if not future.done():
+            self.after(50, self._poll_render, future, invoice)
+            return
+        self.generate_button.configure(state="normal")
+
+        try:
+            out_path = future.result()
+        except Exception as exc:
+            messagebox.showerror("Error", str(exc))
+            return
+        self._write_history(
+            record_invoice_history,
+            {
+                "invoice_number": invoice["invoice_number"],
+                "recipient": invoice["recipient"]["display_name"],
+                "recipient_id": invoice["recipient"]["id"],
+                "service_category": invoice["service_category"],
+                "output_path": str(out_path),
+                "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+                "payment_method": invoice["payment_method"].get("method_type", "bank_domestic"),
+            },
+        )
+        self._on_invoice_generated(out_path)
 
     def _refresh_history(self) -> None:
-        for card in self.history_cards:
-            card.destroy()
-        self.history_cards.clear()
-
-        prune_missing_history_files()
-        cutoff = dt.datetime.now() - timedelta(days=14)
-        entries: list[dict] = []
-        for entry in load_history(limit=200):
-            output_path = entry.get("output_path", "")
-            if not output_path or not Path(output_path).exists():
-                continue
-            created_at_raw = (entry.get("created_at") or "").strip()
-            try:
-                created_at = dt.datetime.fromisoformat(created_at_raw)
-            except Exception:
-                continue
-            if created_at < cutoff:
-                continue
-            entries.append(entry)
-            if len(entries) >= 15:
-                break
-
-        for idx, entry in enumerate(entries, start=1):
-            bubble = ctk.CTkFrame(self.history_frame, corner_radius=14)
-            bubble.pack(fill="x", padx=8, pady=6)
-
-            top = f"#{idx}  {entry.get('invoice_number', '')}"
-            subtitle = f"{entry.get('recipient', 'Unknown')} • {entry.get('created_at', '')}"
-            path = entry.get("output_path", "")
-
-            ctk.CTkLabel(bubble, text=top, font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", padx=10, pady=(8, 0))
-            ctk.CTkLabel(bubble, text=subtitle).pack(anchor="w", padx=10)
-            ctk.CTkLabel(bubble, text=path, text_color=("gray35", "gray70"), wraplength=420, justify="left").pack(anchor="w", padx=10, pady=(0, 6))
-
-            action_row = ctk.CTkFrame(bubble, fg_color="transparent")
-            action_row.pack(anchor="w", padx=10, pady=(0, 8))
-            self._style_button(action_row, "Open", kind="primary", width=72, command=lambda p=path: self._open_invoice_from_history(p)).pack(side=tk.LEFT, padx=(0, 6))
-            self._style_button(action_row, "Delete file", kind="danger", width=96, command=lambda p=path: self._delete_invoice_file(p)).pack(side=tk.LEFT, padx=(0, 6))
-            self._style_button(action_row, "Remove from list", kind="muted", width=122, command=lambda p=path: self._remove_invoice_from_list(p)).pack(side=tk.LEFT)
-
-            for widget in bubble.winfo_children():
-                widget.bind("<Double-Button-1>", lambda _e, p=path: self._open_invoice_from_history(p))
-            bubble.bind("<Double-Button-1>", lambda _e, p=path: self._open_invoice_from_history(p))
-            self.history_cards.append(bubble)
+        if self._history_refresh_after_id is None:
+            self._history_refresh_after_id = self.after(50, self._do_refresh_history)
+
+    def _do_refresh_history(self) -> None:
+        self._history_refresh_after_id = None
+        self._poll_history(self._history_executor.submit(_history_card_lines))
+
+    def _poll_history(self, future: Future) -> None:
+        if not future.done():
+            self.after(30, self._poll_history, future)
+            return
+        try:
+            lines = future.result()
+        except Exception as exc:
+            messagebox.showerror("Error", f"Could not load history: {exc}")
+            return
+        self._render_history(lines)
+
+    def _render_history(self, lines: list[tuple[str, str, str]]) -> None:
+        key = tuple(lines)
+        if key == self._history_key:
+            return
+        self._history_key = key
+        self.history_frame.grid_remove()
+        try:
+            while len(self.history_cards) < len(lines):
+                self.history_cards.append(self._build_history_card())
+                self._history_card_texts.append(None)
+
+            for pos, (texts, card) in enumerate(zip_longest(lines, self.history_cards)):
+                bubble, top_label, subtitle_label, path_var = card
+                rendered = self._history_card_texts[pos]
+                if texts is None:
+                    if rendered is not None:
+                        bubble.pack_forget()
+                        self._history_card_texts[pos] = None
+                    continue
+                if texts == rendered:
+                    continue
+                top_label.configure(text=texts[0])
+                subtitle_label.configure(text=texts[1])
+                path_var.set(texts[2])
+                if rendered is None:
+                    bubble.pack(fill="x", padx=8, pady=6)
+                self._history_card_texts[pos] = texts
+        finally:
+            self.history_frame.grid()
+
+    def _build_history_card(self) -> tuple[ctk.CTkFrame, ctk.CTkLabel, ctk.CTkLabel, tk.StringVar]:
+        bubble = ctk.CTkFrame(self.history_frame, corner_radius=14)
+        path_var = tk.StringVar(value="")
+
+        top_label = ctk.CTkLabel(bubble, text="", font=_font(14, "bold"))
+        top_label.pack(anchor="w", padx=10, pady=(8, 0))
+        subtitle_label = ctk.CTkLabel(bubble, text="")
+        subtitle_label.pack(anchor="w", padx=10)
+        ctk.CTkLabel(bubble, textvariable=path_var, text_color=("gray35", "gray70"), wraplength=420, justify="left").pack(anchor="w", padx=10, pady=(0, 6))
+
+        action_row = ctk.CTkFrame(bubble, fg_color="transparent")
+        action_row.pack(anchor="w", padx=10, pady=(0, 8))
+        self._style_button(action_row, "Open", kind="primary", width=72, command=lambda: self._open_invoice_from_history(path_var.get())).pack(side=tk.LEFT, padx=(0, 6))
+        self._style_button(action_row, "Delete file", kind="danger", width=96, command=lambda: self._delete_invoice_file(path_var.get())).pack(side=tk.LEFT, padx=(0, 6))
+        self._style_button(action_row, "Remove from list", kind="muted", width=122, command=lambda: self._remove_invoice_from_list(path_var.get())).pack(side=tk.LEFT)
+
+        for widget in bubble.winfo_children():
+            widget.bind("<Double-Button-1>", lambda _e: self._open_invoice_from_history(path_var.get()))
+        bubble.bind("<Double-Button-1>", lambda _e: self._open_invoice_from_history(path_var.get()))
+        return bubble, top_label, subtitle_label, path_var
 
     def _open_invoice_from_history(self, raw_path: str) -> None:
-        p = Path(raw_path)
-        if not p.exists():
-            messagebox.showwarning("Missing file", f"File not found:\n{p}")
+        if not os.path.isfile(raw_path):
+            messagebox.showwarning("Missing file", f"File not found:\n{Path(raw_path)}")
             return
-        open_file(p)
+        open_file(Path(raw_path))
 
     def _delete_invoice_file(self, raw_path: str) -> None:
-        p = Path(raw_path)
-        if not p.exists():
-            remove_history_entry(raw_path)
-            self._refresh_history()
+        if not os.path.isfile(raw_path):
+            self._write_history(remove_history_entry, raw_path)
             return
+        p = Path(raw_path)
         if not messagebox.askyesno("Delete file", f"Delete this invoice file?\n{p}"):
             return
         try:
             p.unlink()
-            remove_history_entry(raw_path)
-            self._refresh_history()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
+            return
+        self._write_history(remove_history_entry, raw_path)
 
     def _remove_invoice_from_list(self, raw_path: str) -> None:
-        remove_history_entry(raw_path)
+        self._write_history(remove_history_entry, raw_path)
+
+    def _write_history(self, write: Callable[..., object], *args: object) -> None:
+        self._poll_history_write(self._history_executor.submit(write, *args))
+
+    def _poll_history_write(self, future: Future) -> None:
+        if not future.done():
+            self.after(30, self._poll_history_write, future)
+            return
+        try:
+            future.result()
+        except Exception as exc:
+            messagebox.showerror("Error", f"Could not update history: {exc}")
         self._refresh_history()
 
-    def _simple_record_dialog(self, title: str, fields: list[tuple[str, str]], initial: dict | None = None) -> dict | None:
-        dialog = ctk.CTkToplevel(self)
+    def _simple_record_dialog(self, title: str, fields: tuple[tuple[str, str], ...], initial: dict | None = None) -> dict | None:
+        cached = self._record_dialogs.get(fields)
+        if cached is None or not cached[0].winfo_exists():
+            cached = self._record_dialogs[fields] = self._build_record_dialog(fields)
+        dialog, vars_map, outcome = cached
+
+        initial = initial or {}
+        for key, var in vars_map.items():
+            var.set(initial.get(key, ""))
+        outcome.set("")
         dialog.title(title)
-        dialog.grab_set()
+        dialog.deiconify()
         dialog.attributes("-topmost", True)
+        dialog.lift()
+        dialog.grab_set()
+        self.wait_variable(outcome)
+        if outcome.get() == "destroyed":
+            return None
+        dialog.grab_release()
+        dialog.withdraw()
+        if outcome.get() != "save":
+            return None
+        return {key: var.get().strip() for key, var in vars_map.items()} or None
+
+    def _build_record_dialog(self, fields: tuple[tuple[str, str], ...]) -> tuple[ctk.CTkToplevel, dict[str, tk.StringVar], tk.StringVar]:
+        dialog = ctk.CTkToplevel(self)
+        outcome = tk.StringVar(self)
 
         vars_map: dict[str, tk.StringVar] = {}
+        tooltip_for = SUBWINDOW_TOOLTIPS.get
         for i, (key, label) in enumerate(fields):
-            helper_text = SUBWINDOW_TOOLTIPS.get(label, f"Input for {label.lower()}.")
+            helper_text = tooltip_for(label) or f"Input for {label.lower()}."
             lbl = ctk.CTkLabel(dialog, text=label)
             lbl.grid(row=i, column=0, sticky="w", padx=8, pady=6)
             self._attach_tooltip(lbl, helper_text)
-            var = tk.StringVar(value=(initial or {}).get(key, ""))
+            var = tk.StringVar(dialog)
             vars_map[key] = var
-            ent = ctk.CTkEntry(dialog, textvariable=var, width=360, fg_color="#000000", text_color="#f0f2f4", border_color="#323232", border_width=1)
+            ent = ctk.CTkEntry(dialog, textvariable=var, width=360, **_INPUT_STYLE)
             ent.grid(row=i, column=1, padx=8, pady=6)
-            self._attach_tooltip(ent, SUBWINDOW_TOOLTIPS.get(label, f"Input for {label.lower()}."))
+            self._attach_tooltip(ent, helper_text)
 
-        result = {}
+        self._style_button(dialog, "Save", kind="primary", width=120, command=partial(outcome.set, "save")).grid(row=len(fields), column=0, columnspan=2, pady=8)
+        dialog.protocol("WM_DELETE_WINDOW", partial(outcome.set, "cancel"))
 
-        def submit() -> None:
-            for key in vars_map:
-                result[key] = vars_map[key].get().strip()
-            dialog.destroy()
+        def on_destroy(event) -> None:
+            # Child <Destroy> events also reach the toplevel's bindings; only react to the dialog itself.
+            if event.widget is dialog:
+                outcome.set("destroyed")
 
-        self._style_button(dialog, "Save", kind="primary", width=120, command=submit).grid(row=len(fields), column=0, columnspan=2, pady=8)
-        self.wait_window(dialog)
-        return result or None
+        dialog.bind("<Destroy>", on_destroy, add="+")
+        return dialog, vars_map, outcome
 
     def _profile_current(self, profile_type: str) -> dict | None:
         try:
@@ -913,7 +1398,7 @@ class InvoiceApp(ctk.CTk):
 
     def _add_profile_dialog(self, profile_type: str) -> None:
         if profile_type == "provider":
-            fields = [("display_name", "Name"), ("address", "Address (comma-separated)"), ("email", "Email")]
+            fields = PROVIDER_FIELDS
             result = self._simple_record_dialog("Add provider", fields)
             if not result:
                 return
@@ -921,11 +1406,11 @@ class InvoiceApp(ctk.CTk):
                 "type": "provider",
                 "id": f"provider-{uuid4().hex[:8]}",
                 "display_name": result["display_name"],
-                "address_lines": [x.strip() for x in result["address"].split(",") if x.strip()],
+                "address_lines": _split_address(result["address"]),
                 "email": result["email"],
             }
         elif profile_type == "recipient":
-            fields = [("display_name", "Name"), ("address", "Address (comma-separated)"), ("email", "Email"), ("student_name", "Client reference")]
+            fields = RECIPIENT_FIELDS
             result = self._simple_record_dialog("Add recipient", fields)
             if not result:
                 return
@@ -933,36 +1418,18 @@ class InvoiceApp(ctk.CTk):
                 "type": "recipient",
                 "id": f"recipient-{uuid4().hex[:8]}",
                 "display_name": result["display_name"],
-                "address_lines": [x.strip() for x in result["address"].split(",") if x.strip()],
+                "address_lines": _split_address(result["address"]),
                 "email": result["email"],
                 "student_name": result["student_name"],
             }
         else:
             method = self.payment_type_var.get()
-            if method == "paypal":
-                fields = [("label", "Profile label"), ("paypal_email", "PayPal email"), ("paypal_link", "PayPal link"), ("currency", "Currency")]
-            elif method == "bank_international":
-                fields = [
-                    ("label", "Profile label"),
-                    ("account_holder", "Account holder"),
-                    ("bank_name", "Bank name"),
-                    ("iban", "IBAN"),
-                    ("bic", "BIC/SWIFT (optional)"),
-                    ("currency", "Currency"),
-                ]
-            else:
-                fields = [
-                    ("label", "Profile label"),
-                    ("account_holder", "Account holder"),
-                    ("bank_name", "Bank name"),
-                    ("sort_code", "Sort code (optional)"),
-                    ("account_number", "Account number (optional)"),
-                    ("currency", "Currency"),
-                ]
+            fields = PAYMENT_FIELDS.get(method, PAYMENT_FIELDS["bank_domestic"])
             result = self._simple_record_dialog("Add payment method", fields)
             if not result:
                 return
-            details = {k: v for k, v in result.items() if k != "label"}
+            details = result.copy()
+            details.pop("label", None)
             if not details.get("currency"):
                 details["currency"] = "GBP"
             record = {
@@ -974,8 +1441,10 @@ class InvoiceApp(ctk.CTk):
             }
 
         save_profile(record)
-        self.profiles = self._normalize_loaded_profiles(load_profiles())
-        self._load_defaults()
+        bucket = self.profiles.setdefault(profile_type, [])
+        bucket.append(record)
+        bucket.sort(key=profile_sort_key)
+        self._refresh_profile_widget(profile_type)
         self._select_record(profile_type, record)
 
     def _edit_profile_dialog(self, profile_type: str) -> None:
@@ -985,7 +1454,7 @@ class InvoiceApp(ctk.CTk):
             return
 
         if profile_type == "provider":
-            fields = [("display_name", "Name"), ("address", "Address (comma-separated)"), ("email", "Email")]
+            fields = PROVIDER_FIELDS
             initial = {
                 "display_name": current.get("display_name", ""),
                 "address": ", ".join(current.get("address_lines", [])),
@@ -994,9 +1463,9 @@ class InvoiceApp(ctk.CTk):
             result = self._simple_record_dialog("Edit provider", fields, initial)
             if not result:
                 return
-            current.update({"display_name": result["display_name"], "address_lines": [x.strip() for x in result["address"].split(",") if x.strip()], "email": result["email"]})
+            current.update({"display_name": result["display_name"], "address_lines": _split_address(result["address"]), "email": result["email"]})
         elif profile_type == "recipient":
-            fields = [("display_name", "Name"), ("address", "Address (comma-separated)"), ("email", "Email"), ("student_name", "Client reference")]
+            fields = RECIPIENT_FIELDS
             initial = {
                 "display_name": current.get("display_name", ""),
                 "address": ", ".join(current.get("address_lines", [])),
@@ -1006,56 +1475,25 @@ class InvoiceApp(ctk.CTk):
             result = self._simple_record_dialog("Edit recipient", fields, initial)
             if not result:
                 return
-            current.update({"display_name": result["display_name"], "address_lines": [x.strip() for x in result["address"].split(",") if x.strip()], "email": result["email"], "student_name": result["student_name"]})
+            current.update({"display_name": result["display_name"], "address_lines": _split_address(result["address"]), "email": result["email"], "student_name": result["student_name"]})
         else:
             method = current.get("method_type", "bank_domestic")
             details = current.get("details", {})
-            if method == "paypal":
-                fields = [("label", "Profile label"), ("paypal_email", "PayPal email"), ("paypal_link", "PayPal link"), ("currency", "Currency")]
-                initial = {"label": current.get("label", ""), "paypal_email": details.get("paypal_email", ""), "paypal_link": details.get("paypal_link", ""), "currency": details.get("currency", "GBP")}
-            elif method == "bank_international":
-                fields = [
-                    ("label", "Profile label"),
-                    ("account_holder", "Account holder"),
-                    ("bank_name", "Bank name"),
-                    ("iban", "IBAN"),
-                    ("bic", "BIC/SWIFT (optional)"),
-                    ("currency", "Currency"),
-                ]
-                initial = {
-                    "label": current.get("label", ""),
-                    "account_holder": details.get("account_holder", ""),
-                    "bank_name": details.get("bank_name", ""),
-                    "iban": details.get("iban", ""),
-                    "bic": details.get("bic", ""),
-                    "currency": details.get("currency", "GBP"),
-                }
-            else:
-                fields = [
-                    ("label", "Profile label"),
-                    ("account_holder", "Account holder"),
-                    ("bank_name", "Bank name"),
-                    ("sort_code", "Sort code (optional)"),
-                    ("account_number", "Account number (optional)"),
-                    ("currency", "Currency"),
-                ]
-                initial = {
-                    "label": current.get("label", ""),
-                    "account_holder": details.get("account_holder", ""),
-                    "bank_name": details.get("bank_name", ""),
-                    "sort_code": details.get("sort_code", ""),
-                    "account_number": details.get("account_number", ""),
-                    "currency": details.get("currency", "GBP"),
-                }
+            fields = PAYMENT_FIELDS.get(method, PAYMENT_FIELDS["bank_domestic"])
+            initial = {"label": current.get("label", "")}
+            for key, _label in fields[1:]:
+                initial[key] = details.get(key, "GBP" if key == "currency" else "")
             result = self._simple_record_dialog("Edit payment method", fields, initial)
             if not result:
                 return
             current["label"] = result["label"]
-            current["details"] = {k: v for k, v in result.items() if k != "label"}
+            details = result.copy()
+            details.pop("label", None)
+            current["details"] = details
 
         upsert_profile(current)
-        self.profiles = self._normalize_loaded_profiles(load_profiles())
-        self._load_defaults()
+        self.profiles.get(profile_type, []).sort(key=profile_sort_key)
+        self._refresh_profile_widget(profile_type)
         self._select_record(profile_type, current)
 
     def _delete_profile(self, profile_type: str) -> None:
@@ -1065,12 +1503,23 @@ class InvoiceApp(ctk.CTk):
             return
 
         name = current.get("display_name") or current.get("label") or current["id"]
-        if not messagebox.askyesno("Delete", f"Delete profile '{name}'?"):
-            return
+        self._ask_confirm(f"Delete profile '{name}'?", partial(self._apply_profile_delete, profile_type, current["id"]))
 
-        delete_profile(current["id"], profile_type)
-        self.profiles = self._normalize_loaded_profiles(load_profiles())
-        self._load_defaults()
+    def _apply_profile_delete(self, profile_type: str, profile_id: str) -> None:
+        delete_profile(profile_id, profile_type)
+        self.profiles[profile_type] = [p for p in self.profiles.get(profile_type, []) if p["id"] != profile_id]
+        self._refresh_profile_widget(profile_type)
+
+    def _ask_confirm(self, prompt: str, on_yes: Callable[[], None]) -> None:
+        self._confirm_action = on_yes
+        self.confirm_label.configure(text=prompt)
+        self.confirm_bar.grid()
+
+    def _resolve_confirm(self, confirmed: bool) -> None:
+        action, self._confirm_action = self._confirm_action, None
+        self.confirm_bar.grid_remove()
+        if confirmed and action is not None:
+            action()
 
     def _select_record(self, profile_type: str, record: dict) -> None:
         key = record.get("display_name") or record.get("label") or ""
@@ -1084,6 +1533,8 @@ class InvoiceApp(ctk.CTk):
             self.payment_var.set(key)
 
     def _open_website(self) -> None:
+        import webbrowser
+
         webbrowser.open(WEBSITE_URL)
 
     def _open_invoices_folder(self) -> None:
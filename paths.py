@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+from functools import cache
 from pathlib import Path
 
 APP_NAME = "Invoice_gen"
@@ -11,22 +12,26 @@ def is_frozen() -> bool:
     return bool(getattr(sys, "frozen", False))
 
 
+@cache
 def project_root() -> Path:
     return Path(__file__).resolve().parent
 
 
+@cache
 def bundle_root() -> Path:
     if is_frozen():
         return Path(getattr(sys, "_MEIPASS", Path(sys.executable).resolve().parent))
     return project_root()
 
 
+@cache
 def executable_dir() -> Path:
     if is_frozen():
         return Path(sys.executable).resolve().parent
     return project_root()
 
 
+@cache
 def user_data_dir() -> Path:
     if sys.platform.startswith("win"):
         base = Path(os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming")
@@ -39,6 +44,7 @@ def user_data_dir() -> Path:
     return target
 
 
+@cache
 def invoices_dir() -> Path:
     docs = Path.home() / "Documents"
     target = docs / APP_NAME / "invoices"
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import datetime as dt
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from xml.sax.saxutils import escape
+from types import MappingProxyType
 
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_RIGHT
@@ -12,6 +15,33 @@ from reportlab.lib.units import mm
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
 
+def _build_styles() -> MappingProxyType:
+    styles = getSampleStyleSheet()
+    normal = ParagraphStyle(name="Normal", parent=styles["Normal"], fontName="Helvetica", fontSize=11, leading=14)
+    small = ParagraphStyle(name="Small", parent=styles["Normal"], fontName="Helvetica", fontSize=9, leading=12, textColor=colors.black)
+    return MappingProxyType(
+        {
+            "Title": ParagraphStyle(name="Title", parent=styles["Title"], fontName="Helvetica-Bold", fontSize=20, leading=24, spaceAfter=6),
+            "Normal": normal,
+            "Small": small,
+            "Bold": ParagraphStyle(name="Bold", parent=normal, fontName="Helvetica-Bold"),
+            "Right": ParagraphStyle(name="Right", parent=normal, alignment=TA_RIGHT),
+            "Wrap": ParagraphStyle(name="Wrap", parent=normal, wordWrap="CJK"),
+            "WrapSmall": ParagraphStyle(name="WrapSmall", parent=small, wordWrap="CJK"),
+        }
+    )
+
+
+_STYLES = _build_styles()
+
+
+_HDR_STYLE = TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP"), ("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0)])
+_META_STYLE = TableStyle([("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke), ("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey), ("FONTSIZE", (0, 0), (-1, -1), 10)])
+_LI_STYLE = TableStyle([("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey), ("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey)])
+_TOTALS_STYLE = TableStyle([("ALIGN", (1, 0), (-1, -1), "RIGHT"), ("LINEABOVE", (1, 0), (2, 0), 0.5, colors.black), ("LINEBELOW", (1, 1), (2, 1), 1.0, colors.black)])
+_PAYMENT_STYLE = TableStyle([("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey), ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke)])
+
+
 def initials(name: str) -> str:
     parts = [p for p in name.strip().split() if p]
     if not parts:
@@ -20,14 +50,19 @@ def initials(name: str) -> str:
 
 
 def fmt_date(d: dt.date) -> str:
-    return d.strftime("%d-%m-%Y")
+    return f"{d.day:02d}-{d.month:02d}-{d.year:04d}"
 
 
 def fmt_time(t: dt.datetime) -> str:
-    return t.strftime("%H:%M")
+    return f"{t.hour:02d}:{t.minute:02d}"
 
 
 def money(x: float) -> str:
+    return _money(x + 0.0)
+
+
+@lru_cache(maxsize=1024)
+def _money(x: float) -> str:
     return f"{x:,.2f}"
 
 
@@ -41,17 +76,38 @@ def normalise_lines(value):
     return [str(value).strip()]
 
 
+_XML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_XML_ESCAPE_LINES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\n": "<br/>"})
+
+_SAFE_SUB = {
+    "&lt;b&gt;": "<b>",
+    "&lt;/b&gt;": "</b>",
+    "&lt;br/&gt;": "<br/>",
+    "&lt;br&gt;": "<br/>",
+    "\n": "<br/>",
+}
+_SAFE_RE = re.compile("|".join(map(re.escape, _SAFE_SUB)))
+
+
+@lru_cache(maxsize=512)
+def _para_markup(text: str) -> str:
+    return _SAFE_RE.sub(lambda m: _SAFE_SUB[m.group(0)], text.translate(_XML_ESCAPE))
+
+
 def safe_para(text: str, style: ParagraphStyle) -> Paragraph:
-    s = escape(str(text) if text is not None else "")
-    for k, v in {
-        "&lt;b&gt;": "<b>",
-        "&lt;/b&gt;": "</b>",
-        "&lt;br/&gt;": "<br/>",
-        "&lt;br&gt;": "<br/>",
-    }.items():
-        s = s.replace(k, v)
-    s = s.replace("\n", "<br/>")
-    return Paragraph(s, style)
+    return Paragraph(_para_markup(str(text) if text is not None else ""), style)
+
+
+_PAYMENT_LABELS = {
+    "bank_domestic": "Domestic bank transfer",
+    "bank_international": "International bank transfer",
+    "paypal": "PayPal",
+}
+_PAYMENT_DETAIL_KEYS = {
+    "paypal": (("PayPal email", "paypal_email"), ("PayPal link", "paypal_link")),
+    "bank_international": (("Account holder", "account_holder"), ("Bank", "bank_name"), ("IBAN", "iban"), ("BIC/SWIFT", "bic")),
+    "bank_domestic": (("Account holder", "account_holder"), ("Bank", "bank_name"), ("Sort code", "sort_code"), ("Account number", "account_number")),
+}
 
 
 def payment_rows(payment_method: dict, reference: str, currency: str) -> list[list[str]]:
@@ -61,35 +117,10 @@ def payment_rows(payment_method: dict, reference: str, currency: str) -> list[li
     if method_type == "bank_transfer":
         method_type = "bank_international" if details.get("iban") else "bank_domestic"
 
-    label_map = {
-        "bank_domestic": "Domestic bank transfer",
-        "bank_international": "International bank transfer",
-        "paypal": "PayPal",
-    }
-    rows = [["Payment method", payment_method.get("label", label_map.get(method_type, method_type.title()))], ["Payment currency", details.get("currency", currency)]]
-
-    if method_type == "paypal":
-        rows += [
-            ["PayPal email", details.get("paypal_email", "")],
-            ["PayPal link", details.get("paypal_link", "")],
-            ["Reference", reference],
-        ]
-    elif method_type == "bank_international":
-        rows += [
-            ["Account holder", details.get("account_holder", "")],
-            ["Bank", details.get("bank_name", "")],
-            ["IBAN", details.get("iban", "")],
-            ["BIC/SWIFT", details.get("bic", "")],
-            ["Reference", reference],
-        ]
-    else:
-        rows += [
-            ["Account holder", details.get("account_holder", "")],
-            ["Bank", details.get("bank_name", "")],
-            ["Sort code", details.get("sort_code", "")],
-            ["Account number", details.get("account_number", "")],
-            ["Reference", reference],
-        ]
+    rows = [["Payment method", payment_method.get("label", _PAYMENT_LABELS.get(method_type, method_type.title()))], ["Payment currency", details.get("currency", currency)]]
+    keys = _PAYMENT_DETAIL_KEYS.get(method_type, _PAYMENT_DETAIL_KEYS["bank_domestic"])
+    rows += [[label, details.get(key, "")] for label, key in keys]
+    rows.append(["Reference", reference])
     return rows
 
 
@@ -108,32 +139,31 @@ def build_invoice_pdf(invoice: dict, output_path: Path) -> Path:
     student_name = invoice.get("student_name", "")
 
     label = student_name if student_name.strip() else recipient.get("display_name", "Client")
-    reference = invoice.get("reference") or f"Tut-{initials(label)}-{session_start.strftime('%d%m%y')}"
+    reference = invoice.get("reference") or f"Tut-{initials(label)}-{session_start.day:02d}{session_start.month:02d}{session_start.year % 100:02d}"
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    styles = getSampleStyleSheet()
-    title = ParagraphStyle(name="Title", parent=styles["Title"], fontName="Helvetica-Bold", fontSize=20, leading=24, spaceAfter=6)
-    normal = ParagraphStyle(name="Normal", parent=styles["Normal"], fontName="Helvetica", fontSize=11, leading=14)
-    small = ParagraphStyle(name="Small", parent=styles["Normal"], fontName="Helvetica", fontSize=9, leading=12, textColor=colors.black)
-    bold = ParagraphStyle(name="Bold", parent=normal, fontName="Helvetica-Bold")
-    right = ParagraphStyle(name="Right", parent=normal, alignment=TA_RIGHT)
-    wrap = ParagraphStyle(name="Wrap", parent=normal, wordWrap="CJK")
-    wrap_small = ParagraphStyle(name="WrapSmall", parent=small, wordWrap="CJK")
+    title = _STYLES["Title"]
+    small = _STYLES["Small"]
+    bold = _STYLES["Bold"]
+    right = _STYLES["Right"]
+    wrap = _STYLES["Wrap"]
+    wrap_small = _STYLES["WrapSmall"]
 
-    doc = SimpleDocTemplate(str(output_path), pagesize=A4, rightMargin=20 * mm, leftMargin=20 * mm, topMargin=18 * mm, bottomMargin=18 * mm)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    doc = SimpleDocTemplate(str(tmp_path), pagesize=A4, rightMargin=20 * mm, leftMargin=20 * mm, topMargin=18 * mm, bottomMargin=18 * mm)
     story = [Paragraph("INVOICE", title), Spacer(1, 6)]
 
-    from_lines = [f"<b>{provider['display_name']}</b>"] + normalise_lines(provider.get("address_lines", ""))
+    from_lines = [f"<b>{provider['display_name'].translate(_XML_ESCAPE_LINES)}</b>"] + [line.translate(_XML_ESCAPE_LINES) for line in normalise_lines(provider.get("address_lines", ""))]
     if (provider.get("email") or "").strip():
-        from_lines.append(provider["email"].strip())
+        from_lines.append(provider["email"].strip().translate(_XML_ESCAPE_LINES))
 
-    bill_lines = ["<b>Bill To:</b>", recipient["display_name"]] + normalise_lines(recipient.get("address_lines", ""))
+    bill_lines = ["<b>Bill To:</b>", recipient["display_name"].translate(_XML_ESCAPE_LINES)] + [line.translate(_XML_ESCAPE_LINES) for line in normalise_lines(recipient.get("address_lines", ""))]
     if (recipient.get("email") or "").strip():
-        bill_lines.append(recipient["email"].strip())
+        bill_lines.append(recipient["email"].strip().translate(_XML_ESCAPE_LINES))
 
-    hdr = Table([[safe_para("\n".join(from_lines), small), safe_para("\n".join(bill_lines), small)]], colWidths=[92 * mm, 78 * mm])
-    hdr.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP"), ("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0)]))
+    hdr = Table([[Paragraph("<br/>".join(from_lines), small), Paragraph("<br/>".join(bill_lines), small)]], colWidths=[92 * mm, 78 * mm])
+    hdr.setStyle(_HDR_STYLE)
     story += [hdr, Spacer(1, 10)]
 
     currency = invoice.get("currency", "GBP")
@@ -155,7 +185,7 @@ def build_invoice_pdf(invoice: dict, output_path: Path) -> Path:
         ],
         colWidths=[24 * mm, 62 * mm, 24 * mm, 60 * mm],
     )
-    meta.setStyle(TableStyle([("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke), ("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey), ("FONTSIZE", (0, 0), (-1, -1), 10)]))
+    meta.setStyle(_META_STYLE)
     story += [meta, Spacer(1, 12)]
 
     col_desc, col_qty, col_rate, col_amt = 95 * mm, 20 * mm, 25 * mm, 30 * mm
@@ -168,17 +198,22 @@ def build_invoice_pdf(invoice: dict, output_path: Path) -> Path:
             [safe_para(f"Preparation (not billed): {prep_hours:.2f} hours\n{prep_description}", wrap_small), safe_para(f"{prep_hours:.2f}", right), safe_para(money(prep_rate), right), safe_para(money(0.00), right)]
         )
     li = Table(items, colWidths=[col_desc, col_qty, col_rate, col_amt], repeatRows=1)
-    li.setStyle(TableStyle([("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey), ("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey)]))
+    li.setStyle(_LI_STYLE)
     story += [li, Spacer(1, 10)]
 
     totals = Table([["", safe_para("<b>Subtotal</b>", right), safe_para(money(billed), right)], ["", safe_para("<b>Total</b>", right), safe_para(money(billed), right)]], colWidths=[col_desc + col_qty, col_rate, col_amt])
-    totals.setStyle(TableStyle([("ALIGN", (1, 0), (-1, -1), "RIGHT"), ("LINEABOVE", (1, 0), (2, 0), 0.5, colors.black), ("LINEBELOW", (1, 1), (2, 1), 1.0, colors.black)]))
+    totals.setStyle(_TOTALS_STYLE)
     story += [totals, Spacer(1, 14), safe_para("<b>Payment details</b>", bold)]
 
     pay_rows = payment_rows(invoice["payment_method"], reference, currency)
     pd_table = Table([[safe_para(k, small), safe_para(v, wrap_small)] for k, v in pay_rows], colWidths=[48 * mm, 122 * mm])
-    pd_table.setStyle(TableStyle([("BOX", (0, 0), (-1, -1), 0.5, colors.grey), ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.grey), ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke)]))
+    pd_table.setStyle(_PAYMENT_STYLE)
     story += [pd_table, Spacer(1, 10), safe_para("Thank you. Please use the payment reference shown above.", wrap_small)]
 
-    doc.build(story)
+    try:
+        doc.build(story)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     return output_path
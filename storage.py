@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import copy
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from paths import bundled_seed_profiles_path, user_data_dir
 
@@ -12,40 +15,84 @@ LOCAL_FILE = DATA_DIR / "profiles.local.jsonl"
 HISTORY_FILE = DATA_DIR / "history.local.jsonl"
 SETTINGS_FILE = DATA_DIR / "defaults.local.json"
 
+_profiles_cache: Optional[Tuple[tuple, Dict[str, List[dict]]]] = None
+_settings_cache: Optional[Tuple[tuple, dict]] = None
+_history_cache: Optional[Tuple[tuple, List[dict]]] = None
+_seed_cache: Optional[Tuple[tuple, Dict[str, dict]]] = None
+# Guards HISTORY_FILE and _history_cache, which worker threads and the UI both touch.
+_history_lock = threading.RLock()
+
+_COMPACT_MIN_BYTES = 64 * 1024
+_local_compacted_size = 0
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
 
 def _read_jsonl(path: Path) -> List[dict]:
-    if not path.exists():
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    # split("\n"), not splitlines(): ensure_ascii=False leaves U+2028 and friends raw inside records.
+    lines = [raw for raw in text.split("\n") if raw.strip()]
+    if not lines:
         return []
-    rows: List[dict] = []
-    with path.open("r", encoding="utf-8") as f:
-        for raw in f:
-            raw = raw.strip()
-            if not raw:
-                continue
-            rows.append(json.loads(raw))
-    return rows
+    return json.loads("[" + ",".join(lines) + "]")
+
+
+def _dumps_row(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
 
 
 def _write_jsonl(path: Path, records: List[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
         for record in records:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.write(_dumps_row(record) + "\n")
+    os.replace(tmp_path, path)
 
 
 def _append_jsonl(path: Path, record: dict) -> None:
+    _append_jsonl_many(path, [record])
+
+
+def _append_jsonl_many(path: Path, records: List[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write("".join(_dumps_row(record) + "\n" for record in records))
+
+
+def profile_sort_key(item: dict) -> str:
+    return item.get("display_name") or item.get("label") or item.get("id", "")
+
+
+def _seed_items(stamp: Optional[Tuple[int, int]]) -> Dict[str, dict]:
+    global _seed_cache
+    if _seed_cache is not None and _seed_cache[0] == stamp:
+        return _seed_cache[1]
+    items = {row["id"]: row for row in _read_jsonl(SEED_FILE) if "id" in row and "type" in row}
+    _seed_cache = (stamp, items)
+    return items
 
 
 def load_profiles() -> Dict[str, List[dict]]:
     """Load committed seed profiles and overlay local profiles by id."""
-    items_by_id: Dict[str, dict] = {}
-    for row in _read_jsonl(SEED_FILE) + _read_jsonl(LOCAL_FILE):
-        if "id" not in row or "type" not in row:
-            continue
-        items_by_id[row["id"]] = row
+    global _profiles_cache
+    stamp = (_stamp(SEED_FILE), _stamp(LOCAL_FILE))
+    if _profiles_cache is not None and _profiles_cache[0] == stamp:
+        return copy.deepcopy(_profiles_cache[1])
+
+    items_by_id = dict(_seed_items(stamp[0]))
+    for row in _read_jsonl(LOCAL_FILE):
+        if "id" in row and "type" in row:
+            items_by_id[row["id"]] = row
 
     grouped: Dict[str, List[dict]] = {"provider": [], "recipient": [], "payment_method": []}
     for item in items_by_id.values():
@@ -54,12 +101,25 @@ def load_profiles() -> Dict[str, List[dict]]:
         grouped.setdefault(item["type"], []).append(item)
 
     for bucket in grouped.values():
-        bucket.sort(key=lambda x: x.get("display_name") or x.get("label") or x.get("id", ""))
-    return grouped
+        bucket.sort(key=profile_sort_key)
+    _profiles_cache = (stamp, grouped)
+    return copy.deepcopy(grouped)
 
 
 def save_profile(record: dict) -> None:
     _append_jsonl(LOCAL_FILE, record)
+    stamp = _stamp(LOCAL_FILE)
+    if stamp is not None and stamp[1] > max(_COMPACT_MIN_BYTES, 2 * _local_compacted_size):
+        compact_local_profiles()
+
+
+def compact_local_profiles() -> None:
+    global _local_compacted_size
+    latest = {row["id"]: row for row in _read_jsonl(LOCAL_FILE) if "id" in row and "type" in row}
+    seed = _seed_items(_stamp(SEED_FILE))
+    kept = [row for row in latest.values() if not (row.get("_deleted") and row["id"] not in seed)]
+    _write_jsonl(LOCAL_FILE, kept)
+    _local_compacted_size = LOCAL_FILE.stat().st_size
 
 
 def upsert_profile(record: dict) -> None:
@@ -71,51 +131,88 @@ def delete_profile(profile_id: str, profile_type: str) -> None:
 
 
 def record_invoice_history(record: dict) -> None:
-    _append_jsonl(HISTORY_FILE, record)
+    record_invoice_histories([record])
+
+
+def record_invoice_histories(records: List[dict]) -> None:
+    global _history_cache
+    if not records:
+        return
+    with _history_lock:
+        before = _stamp(HISTORY_FILE)
+        _append_jsonl_many(HISTORY_FILE, records)
+        if _history_cache is not None and _history_cache[0] == before:
+            _history_cache = (_stamp(HISTORY_FILE), _history_cache[1] + list(records))
+
+
+def _read_history() -> List[dict]:
+    global _history_cache
+    with _history_lock:
+        stamp = _stamp(HISTORY_FILE)
+        if stamp is None:
+            return []
+        if _history_cache is not None and _history_cache[0] == stamp:
+            return _history_cache[1]
+        items = _read_jsonl(HISTORY_FILE)
+        _history_cache = (stamp, items)
+        return items
 
 
 def load_history(limit: int = 30) -> List[dict]:
-    items = _read_jsonl(HISTORY_FILE)
+    items = _read_history()
     return list(reversed(items[-limit:]))
 
 
 def load_history_all() -> List[dict]:
-    return _read_jsonl(HISTORY_FILE)
+    return list(_read_history())
 
 
 def save_history(items: List[dict]) -> None:
-    _write_jsonl(HISTORY_FILE, items)
+    with _history_lock:
+        _write_jsonl(HISTORY_FILE, items)
 
 
 def prune_missing_history_files() -> int:
-    items = _read_jsonl(HISTORY_FILE)
-    kept: List[dict] = []
-    removed = 0
-    for item in items:
-        path = item.get("output_path")
-        if not path or Path(path).exists():
-            kept.append(item)
-        else:
-            removed += 1
-    if removed:
-        _write_jsonl(HISTORY_FILE, kept)
-    return removed
+    with _history_lock:
+        items = _read_history()
+        kept: List[dict] = []
+        removed = 0
+        for item in items:
+            path = item.get("output_path")
+            if not path or os.path.isfile(path):
+                kept.append(item)
+            else:
+                removed += 1
+        if removed:
+            _write_jsonl(HISTORY_FILE, kept)
+        return removed
 
 
 def remove_history_entry(output_path: str) -> None:
-    items = _read_jsonl(HISTORY_FILE)
-    kept = [i for i in items if i.get("output_path") != output_path]
-    _write_jsonl(HISTORY_FILE, kept)
+    with _history_lock:
+        items = _read_history()
+        kept = [i for i in items if i.get("output_path") != output_path]
+        _write_jsonl(HISTORY_FILE, kept)
 
 
 def load_settings() -> dict:
-    if not SETTINGS_FILE.exists():
+    global _settings_cache
+    stamp = _stamp(SETTINGS_FILE)
+    if stamp is None:
         return {"selected_profiles": {}, "field_defaults": {}}
+    if _settings_cache is not None and _settings_cache[0] == stamp:
+        return copy.deepcopy(_settings_cache[1])
     with SETTINGS_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+        settings = json.load(f)
+    _settings_cache = (stamp, settings)
+    return copy.deepcopy(settings)
 
 
 def save_settings(settings: dict) -> None:
+    global _settings_cache
     SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with SETTINGS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(settings, f, indent=2, ensure_ascii=False)
+    tmp_path = SETTINGS_FILE.with_name(SETTINGS_FILE.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8", buffering=64 * 1024) as f:
+        f.write(json.dumps(settings, indent=2, ensure_ascii=False))
+    os.replace(tmp_path, SETTINGS_FILE)
+    _settings_cache = (_stamp(SETTINGS_FILE), copy.deepcopy(settings))